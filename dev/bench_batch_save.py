@@ -0,0 +1,45 @@
+# Benchmark: thời gian khởi tạo N module trên cùng 1 file YAML,
+# ghi từng module (to_yaml) so với gom lại bằng TactParameters.batch_save.
+#
+#   python dev/bench_batch_save.py
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, yaml_cache
+
+
+class BenchParams(TactParameters):
+    def __init__(self, ModuleName, file_path):
+        super().__init__(ModuleName=ModuleName)
+        self.threshold = 0.5
+        self.classes = [f"class_{i}" for i in range(20)]
+        self.roi = {"x": 0, "y": 0, "w": 1920, "h": 1080}
+        self.load_then_save_to_yaml(file_path=file_path)
+
+
+def build_modules(n, file_path, batched):
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    yaml_cache.invalidate()
+    t0 = time.perf_counter()
+    if batched:
+        with TactParameters.batch_save(file_path):
+            for i in range(n):
+                BenchParams(f"Module_{i:03d}", file_path)
+    else:
+        for i in range(n):
+            BenchParams(f"Module_{i:03d}", file_path)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = os.path.join(tmp, "bench.yml")
+        print(f"{'modules':>8} {'per-module (s)':>15} {'batched (s)':>12} {'speedup':>8}")
+        for n in (1, 10, 30, 100):
+            t_single = build_modules(n, fn, batched=False)
+            t_batch = build_modules(n, fn, batched=True)
+            print(f"{n:>8} {t_single:>15.4f} {t_batch:>12.4f} {t_single / t_batch:>7.1f}x")
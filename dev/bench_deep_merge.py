@@ -0,0 +1,100 @@
+# Benchmark: _deep_merge structural-sharing so với bản copy toàn bộ trước đây,
+# trên config lồng nhau lớn (dict + DotDict + nested class) khi file không đổi / đổi vài key.
+#
+#   python dev/bench_deep_merge.py
+import os
+import sys
+import copy
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, DotDict
+
+
+def old_deep_merge(p, default, from_file):
+    """Bản trước đây, giữ lại để so sánh kết quả và tốc độ."""
+    if isinstance(from_file, dict):
+        if isinstance(default, dict):
+            base = dict(default)
+            convert_to_dotdict = False
+        elif isinstance(default, DotDict):
+            base = copy.deepcopy(default.to_dict())  # to_dict() cũ trả về bản copy sâu
+            convert_to_dotdict = True
+        elif p._is_nested_class(default):
+            base = p._to_plain_dict(default)
+            convert_to_dotdict = True
+        else:
+            base = {}
+            convert_to_dotdict = False
+        for k, v in from_file.items():
+            base[k] = old_deep_merge(p, base.get(k), v)
+        return DotDict(base) if convert_to_dotdict else base
+    elif isinstance(from_file, (list, tuple)):
+        return list(from_file)
+    return from_file
+
+
+def retained_kb(fn, defaults, from_file):
+    """KB cấp phát mới còn giữ bởi kết quả merge (phần không dùng lại từ default/file)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn(defaults, from_file)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    return sum(s.size_diff for s in after.compare_to(before, "filename")) / 1024
+
+
+def make_defaults(n=300):
+    class clsServer:
+        host = "localhost"
+        port = 8080
+        tags = ["a", "b"]
+
+    return {
+        "cameras": {f"cam_{i}": {"ip": f"10.0.0.{i % 255}", "roi": [0, 0, 640, 480],
+                                 "opts": {"fps": 25, "codec": "h264"}} for i in range(n)},
+        "lookup": DotDict({f"k{i}": {"v": i, "name": f"n{i}"} for i in range(n)}),
+        "server": clsServer(),
+        # YAML đọc tuple thành list: không được tính là override
+        "frame_size": (1920, 1080),
+        "zones": {"entry": (0, 0, 100, 100), "exit": [(1, 2), (3, 4)]},
+    }
+
+
+def file_from(p, defaults, n_changes):
+    data = p._to_plain_dict(defaults)
+    for i in range(n_changes):
+        data["cameras"][f"cam_{i}"]["opts"]["fps"] = 30
+        data["lookup"][f"k{i}"]["v"] = -i
+    return data
+
+
+if __name__ == "__main__":
+    p = TactParameters()
+    defaults = make_defaults()
+    print(f"{'changes':>8} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>8} "
+          f"{'old KB':>8} {'new KB':>8}  overridden")
+    for n_changes in (0, 5, 300):
+        from_file = file_from(p, defaults, n_changes)
+        merges = {"old": lambda d, f: {k: old_deep_merge(p, d[k], f[k]) for k in f},
+                  "new": lambda d, f: {k: p._deep_merge(d[k], f[k]) for k in f}}
+        results = {name: fn(defaults, copy.deepcopy(from_file)) for name, fn in merges.items()}
+        kb = {name: retained_kb(fn, defaults, copy.deepcopy(from_file)) for name, fn in merges.items()}
+        # Kết quả phải giống hệt: cùng giá trị, cùng type ở mỗi key top-level
+        assert TactParameters._plain_equal(p._to_plain_dict(results["old"]), p._to_plain_dict(results["new"]))
+        assert all(type(results["old"][k]) is type(results["new"][k]) for k in from_file)
+
+        files = [copy.deepcopy(from_file) for _ in range(30)]
+        it = iter(files)
+        t_old = timeit.timeit(lambda: {k: old_deep_merge(p, defaults[k], v) for k, v in next(it).items()}, number=30)
+        it = iter(files)
+        t_new = timeit.timeit(lambda: {k: p._deep_merge(defaults[k], v) for k, v in next(it).items()}, number=30)
+
+        paths = set()
+        for k, v in from_file.items():
+            p._deep_merge(defaults[k], v, paths, (k,))
+        assert n_changes or not paths, f"file không đổi nhưng báo override: {sorted(paths)}"
+        print(f"{n_changes:>8} {t_old / 30 * 1000:>10.2f} {t_new / 30 * 1000:>10.2f} "
+              f"{t_old / t_new:>7.1f}x {kb['old']:>8.1f} {kb['new']:>8.1f}  {len(paths)}")
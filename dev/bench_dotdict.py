@@ -0,0 +1,77 @@
+# Benchmark: DotDict mới (1 dict bên dưới, wrap con lazy, to_dict() zero-copy) so với
+# bản cũ (setattr từng key vào __dict__, wrap đệ quy lúc khởi tạo, to_dict() dựng lại cả cây).
+#
+#   python dev/bench_dotdict.py [num_keys]
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import DotDict
+
+
+class OldDotDict:
+    """Bản trước đây, giữ lại để so sánh bộ nhớ và tốc độ."""
+
+    def __init__(self, data: dict = None):
+        for key, value in (data or {}).items():
+            if isinstance(value, dict):
+                setattr(self, key, OldDotDict(value))
+            else:
+                setattr(self, key, value)
+
+    def to_dict(self) -> dict:
+        result = {}
+        for k, v in self.__dict__.items():
+            if isinstance(v, OldDotDict):
+                result[k] = v.to_dict()
+            else:
+                result[k] = v
+        return result
+
+
+def make_data(n):
+    return {f"cam_{i}": {"ip": f"10.0.{i // 255}.{i % 255}", "port": 554,
+                         "roi": {"x": 0, "y": 0, "w": 640, "h": 480},
+                         "opts": {"fps": 25, "codec": "h264"}} for i in range(n)}
+
+
+def retained_kb(factory):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = factory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del obj
+    return sum(s.size_diff for s in after.compare_to(before, "filename")) / 1024
+
+
+def ms(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    data = make_data(n)
+    old, new = OldDotDict(data), DotDict(data)
+    keys = [f"cam_{i}" for i in range(0, n, max(1, n // 1000))]
+
+    assert new.to_dict() == old.to_dict() == data
+    assert all(getattr(new, k).roi.w == getattr(old, k).roi.w for k in keys)
+
+    rows = [
+        ("construct", lambda: OldDotDict(data), lambda: DotDict(data), 5),
+        ("to_dict", old.to_dict, new.to_dict, 5),
+        ("attr get x1000", lambda: [getattr(old, k).roi.w for k in keys],
+         lambda: [getattr(new, k).roi.w for k in keys], 20),
+    ]
+    print(f"{n} key top-level, {n * 3} dict lồng nhau")
+    print(f"{'op':>15} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>9}")
+    for name, f_old, f_new, number in rows:
+        t_old, t_new = ms(f_old, number), ms(f_new, number)
+        print(f"{name:>15} {t_old:>10.3f} {t_new:>10.3f} {t_old / max(t_new, 1e-9):>8.0f}x")
+
+    kb_old = retained_kb(lambda: OldDotDict(data))
+    kb_new = retained_kb(lambda: DotDict(data))
+    print(f"{'memory (KB)':>15} {kb_old:>10.0f} {kb_new:>10.0f} {kb_old / max(kb_new, 1e-9):>8.0f}x")
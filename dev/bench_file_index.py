@@ -0,0 +1,69 @@
+# Benchmark: find_files quét cả cây so với find_files(index=...) (SQLite, chỉ quét lại thư mục
+# có mtime đổi) trên cây thư mục giả lập. Mặc định 1.000.000 file (10.000 thư mục x 100 file);
+# tạo cây mất vài phút, có thể giảm bằng tham số.
+#
+#   python dev/bench_file_index.py [num_dirs] [files_per_dir] [nas_latency_ms]
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, FileIndex
+
+
+def make_tree(root, num_dirs, files_per_dir):
+    for d in range(num_dirs):
+        sub = os.path.join(root, f"cam_{d % 50:02d}", f"day_{d // 50:04d}")
+        os.makedirs(sub, exist_ok=True)
+        for i in range(files_per_dir):
+            open(os.path.join(sub, f"img_{i:05d}.jpg"), "w").close()
+
+
+def timed(label, fn, baseline=None):
+    t0 = time.perf_counter()
+    result = fn()
+    t = time.perf_counter() - t0
+    speedup = f"{baseline / t:>7.1f}x" if baseline else ""
+    print(f"{label:>28} {t:>9.3f}s {speedup}")
+    return t, result
+
+
+if __name__ == "__main__":
+    num_dirs = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    files_per_dir = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "dataset")
+        t0 = time.perf_counter()
+        make_tree(root, num_dirs, files_per_dir)
+        print(f"Tạo {num_dirs * files_per_dir} file / {num_dirs} thư mục: {time.perf_counter() - t0:.1f}s")
+        # Để mtime các thư mục "cũ" hơn ngưỡng racy của FileIndex (2s)
+        time.sleep(2.1)
+        if latency:
+            real_scandir = os.scandir
+
+            def slow_scandir(path="."):
+                time.sleep(latency)
+                return real_scandir(path)
+
+            os.scandir = slow_scandir
+
+        index = FileIndex(os.path.join(tmp, "index.sqlite"))
+        t_walk, ref = timed("find_files (quét cả cây)", lambda: TactParameters.find_files(root))
+        timed("index: lần đầu (build)", lambda: TactParameters.find_files(root, index=index), t_walk)
+        t, got = timed("index: không đổi gì", lambda: TactParameters.find_files(root, index=index), t_walk)
+        assert got == ref
+        t_walk_ns, _ = timed("find_files sort=False", lambda: TactParameters.find_files(root, sort=False))
+        timed("index sort=False", lambda: TactParameters.find_files(root, index=index, sort=False), t_walk_ns)
+
+        # Thêm/xóa file trong 1% số thư mục
+        for d in range(0, num_dirs, 100):
+            sub = os.path.join(root, f"cam_{d % 50:02d}", f"day_{d // 50:04d}")
+            open(os.path.join(sub, "new.jpg"), "w").close()
+            os.remove(os.path.join(sub, "img_00000.jpg"))
+        time.sleep(2.1)
+        ref = TactParameters.find_files(root)
+        t, got = timed("index: đổi 1% thư mục", lambda: TactParameters.find_files(root, index=index), t_walk)
+        assert got == ref
+        print(index.refresh(root))
@@ -0,0 +1,78 @@
+# Benchmark: find_files trên cây thư mục giả lập dataset ảnh (nhiều thư mục con):
+# bản os.walk + sort cũ, quét tuần tự (workers=1), quét song song, không sort,
+# và thời gian tới file đầu tiên của iter_files (generator).
+#
+# Thêm độ trễ giả lập NAS (ms mỗi lần liệt kê thư mục) để thấy lợi ích của quét song song;
+# ổ đĩa local thì scandir gần như không chờ I/O nên nhiều thread không nhanh hơn.
+#
+#   python dev/bench_find_files.py [num_dirs] [files_per_dir] [nas_latency_ms]
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters
+
+
+def old_find_files(directory, exts=(".jpg", ".jpeg", ".png")):
+    """Bản trước đây, giữ lại để so sánh kết quả và tốc độ."""
+    return sorted(
+        os.path.join(root, f).replace("\\", "/")
+        for root, _, files in os.walk(directory)
+        for f in files if f.lower().endswith(exts)
+    )
+
+
+def make_tree(root, num_dirs, files_per_dir):
+    for d in range(num_dirs):
+        sub = os.path.join(root, f"cam_{d % 20:02d}", f"2026_{d // 20:04d}")
+        os.makedirs(sub, exist_ok=True)
+        for i in range(files_per_dir):
+            ext = (".jpg", ".png", ".txt", ".JPG")[i % 4]
+            open(os.path.join(sub, f"img_{i:05d}{ext}"), "w").close()
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+if __name__ == "__main__":
+    num_dirs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    files_per_dir = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        make_tree(tmp, num_dirs, files_per_dir)
+        if latency:
+            real_scandir = os.scandir
+
+            def slow_scandir(path="."):
+                time.sleep(latency)
+                return real_scandir(path)
+
+            os.scandir = slow_scandir  # os.walk cũng gọi os.scandir
+        t_old, ref = timed(lambda: old_find_files(tmp))
+        cases = {
+            "workers=1": lambda: TactParameters.find_files(tmp, workers=1),
+            "workers=8": lambda: TactParameters.find_files(tmp, workers=8),
+            "workers=8 no sort": lambda: TactParameters.find_files(tmp, workers=8, sort=False),
+        }
+        print(f"{num_dirs * files_per_dir} file, {num_dirs} thư mục, {len(ref)} ảnh, độ trễ {latency * 1000:g} ms/thư mục")
+        print(f"{'case':>20} {'time (s)':>9} {'speedup':>8}")
+        print(f"{'old os.walk':>20} {t_old:>9.3f} {'1.0x':>8}")
+        for name, fn in cases.items():
+            t, got = timed(fn)
+            assert sorted(got) == ref, name
+            print(f"{name:>20} {t:>9.3f} {t_old / t:>7.1f}x")
+
+        for workers in (1, 8):
+            t0 = time.perf_counter()
+            it = TactParameters.iter_files(tmp, workers=workers)
+            next(it)
+            print(f"{f'1st file workers={workers}':>20} {time.perf_counter() - t0:>9.4f}")
+            it.close()
+
+        n = sum(1 for _ in TactParameters.iter_files(tmp, exts=None, include="*.txt", exclude="cam_0[0-4]", max_depth=2))
+        print(f"include/exclude/max_depth: {n} file .txt ngoài cam_00..04")
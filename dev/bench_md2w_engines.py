@@ -0,0 +1,56 @@
+# Benchmark: md2w engine html (Markdown -> HTML -> BeautifulSoup) so với engine direct
+# (cây Markdown -> docx) trên file .md 1 KB .. 10 MB. Kiểm tra document.xml giống hệt nhau.
+#
+#   python dev/bench_md2w_engines.py               # 1KB 100KB 1MB 10MB
+#   python dev/bench_md2w_engines.py 1KB 1MB       # chọn kích thước
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.md_word.convert_md_to_word import convert_md_file_to_docx
+
+SIZES = {"1KB": 1 << 10, "100KB": 100 << 10, "1MB": 1 << 20, "10MB": 10 << 20}
+
+
+def make_md(path, target_bytes):
+    """Sinh file .md giống báo cáo thật: heading, đoạn văn, list, code block, bảng nhỏ."""
+    with open(path, "w", encoding="utf-8") as f:
+        i = 0
+        while f.tell() < target_bytes:
+            f.write(f"## Mục {i}\n\nĐoạn văn **đậm**, *nghiêng*, `code_{i}` và [link](http://x/{i}).\n"
+                    f"Dòng thứ hai của đoạn {i}.\n\n")
+            f.write("".join(f"- Ý {k} của mục {i}\n" for k in range(4)) + "\n")
+            f.write(f"```python\nfor k in range({i}):\n    print(k * 2)\n```\n\n")
+            f.write("| Camera | FPS | Trạng thái |\n|---|---|---|\n" +
+                    "".join(f"| cam_{r} | {25 + r} | OK |\n" for r in range(3)) + "\n")
+            i += 1
+
+
+def run(md_path, engine):
+    out = md_path.with_name(f"{md_path.stem}.{engine}.docx")
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        convert_md_file_to_docx(md_path, out, engine=engine)
+    elapsed = time.perf_counter() - t0
+    with zipfile.ZipFile(out) as z:
+        return elapsed, z.read("word/document.xml")
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(SIZES)
+    print(f"{'size':>6} {'html (s)':>9} {'direct (s)':>11} {'html MB/s':>10} {'direct MB/s':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            md_path = Path(tmp) / f"doc_{name}.md"
+            make_md(md_path, SIZES[name])
+            mb = md_path.stat().st_size / (1 << 20)
+            t_html, ref = run(md_path, "html")
+            t_direct, got = run(md_path, "direct")
+            assert got == ref, f"{name}: document.xml của 2 engine khác nhau"
+            print(f"{name:>6} {t_html:>9.3f} {t_direct:>11.3f} {mb / t_html:>10.2f} {mb / t_direct:>12.2f} "
+                  f"{t_html / t_direct:>7.1f}x")
@@ -0,0 +1,54 @@
+# Benchmark: md2w convert tuần tự so với --jobs N (process pool) trên bộ file .md sinh tự động
+# (heading, đoạn văn, list, code block, bảng). Kiểm tra output của 2 cách giống hệt nhau.
+#
+#   python dev/bench_md2w_jobs.py [num_files] [jobs]
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.md_word.convert_md_to_word import convert_many
+
+
+def make_report(i, sections=8, table_rows=30):
+    parts = [f"# Báo cáo {i}\n"]
+    for s in range(sections):
+        parts.append(f"## Mục {s}\n\nĐoạn văn **đậm** và *nghiêng* với `code` số {i}-{s}. " * 3 + "\n")
+        parts.append("".join(f"- Ý {k} của mục {s}\n" for k in range(5)) + "\n")
+        parts.append("```python\n" + "".join(f"x_{k} = {k} * {s}\n" for k in range(6)) + "```\n")
+        parts.append("| Camera | FPS | Trạng thái |\n|---|---|---|\n" +
+                     "".join(f"| cam_{r} | {25 + r % 5} | OK |\n" for r in range(table_rows)) + "\n")
+    return "\n".join(parts)
+
+
+def document_xml(docx_path):
+    with zipfile.ZipFile(docx_path) as z:
+        return z.read("word/document.xml")
+
+
+def run(md_files, jobs):
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        ok, errors, _ = convert_many(md_files, jobs=jobs)
+    assert (ok, errors) == (len(md_files), 0), (ok, errors)
+    return time.perf_counter() - t0, [document_xml(f.with_suffix(".docx")) for f in md_files]
+
+
+if __name__ == "__main__":
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        md_files = []
+        for i in range(num_files):
+            path = Path(tmp) / f"report_{i:04d}.md"
+            path.write_text(make_report(i), encoding="utf-8")
+            md_files.append(path)
+        t_seq, ref = run(md_files, 1)
+        t_par, got = run(md_files, jobs)
+        assert got == ref, "Output song song khác tuần tự"
+        print(f"{num_files} file: tuần tự {t_seq:.2f}s ({num_files / t_seq:.1f} file/s), "
+              f"--jobs {jobs} {t_par:.2f}s ({num_files / t_par:.1f} file/s), {t_seq / t_par:.1f}x")
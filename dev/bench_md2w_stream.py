@@ -0,0 +1,73 @@
+# Benchmark bộ nhớ: md2w convert cả file (engine direct) so với --stream (từng khối 64 KB)
+# trên file .md 1 MB .. 50 MB. Mỗi lần convert chạy trong process riêng, đo RSS đỉnh (VmHWM).
+# Kiểm tra document.xml của 2 chế độ giống hệt nhau.
+#
+#   python dev/bench_md2w_stream.py                 # 1MB 5MB 20MB
+#   python dev/bench_md2w_stream.py 50MB --full     # đo cả chế độ convert cả file ở mọi kích thước
+#
+# Mặc định chỉ convert cả file (full) với file <= 1 MB: lớn hơn thì rất chậm (python-docx chèn
+# element vào body càng lúc càng chậm khi body lớn dần) và đúng là thứ --stream tránh được.
+import os
+import sys
+import time
+import hashlib
+import zipfile
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from bench_md2w_engines import make_md
+
+SIZES = {"1MB": 1 << 20, "5MB": 5 << 20, "20MB": 20 << 20, "50MB": 50 << 20}
+
+
+def peak_rss_kb():
+    # ru_maxrss trên Linux giữ cả đỉnh RSS của process cha trước fork/exec -> đọc VmHWM nếu có
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(mode, md_path, out_path):
+    from tatools01.md_word.convert_md_to_word import convert_md_file_to_docx
+    import contextlib
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        convert_md_file_to_docx(Path(md_path), Path(out_path), engine="direct", stream=(mode == "stream"))
+    print(time.perf_counter() - t0, peak_rss_kb())
+
+
+def run(mode, md_path):
+    out = md_path.with_name(f"{md_path.stem}.{mode}.docx")
+    res = subprocess.run([sys.executable, __file__, "--child", mode, str(md_path), str(out)],
+                         check=True, capture_output=True, text=True)
+    elapsed, maxrss_kb = res.stdout.split()
+    with zipfile.ZipFile(out) as z:
+        digest = hashlib.blake2b(z.read("word/document.xml")).hexdigest()
+    out.unlink()
+    return float(elapsed), int(maxrss_kb) / 1024, digest
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(*sys.argv[2:5])
+        sys.exit(0)
+    names = [a for a in sys.argv[1:] if not a.startswith("--")] or ["1MB", "5MB", "20MB"]
+    print(f"{'size':>6} {'mode':>7} {'time (s)':>9} {'peak RSS (MB)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            md_path = Path(tmp) / f"doc_{name}.md"
+            make_md(md_path, SIZES[name])
+            modes = ["full", "stream"] if SIZES[name] <= SIZES["1MB"] or "--full" in sys.argv else ["stream"]
+            results = {mode: run(mode, md_path) for mode in modes}
+            if len(results) == 2:
+                assert results["full"][2] == results["stream"][2], f"{name}: document.xml của 2 chế độ khác nhau"
+            for mode, (elapsed, rss, _) in results.items():
+                print(f"{name:>6} {mode:>7} {elapsed:>9.2f} {rss:>14.1f}")
@@ -0,0 +1,91 @@
+# Benchmark: add_table (dựng XML row/cell hàng loạt từ template) so với bản cũ
+# (table.rows[i].cells[j] + parse_xml shading cho từng cell) trên bảng 100 / 1.000 / 10.000 dòng.
+# Kiểm tra document.xml giống hệt nhau.
+#
+#   python dev/bench_md2w_table.py                 # 100 1000 10000
+#   python dev/bench_md2w_table.py 100 1000 --old  # đo cả bản cũ (chậm, bậc 2 theo số dòng)
+import io
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.md_word.convert_md_to_word import (
+    Document, RGBColor, WD_TABLE_ALIGNMENT, parse_xml, nsdecls, add_table, set_table_borders, set_table_autofit)
+
+
+def old_set_cell_shading(cell, color_hex):
+    cell._tc.get_or_add_tcPr().append(parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color_hex}" w:val="clear"/>'))
+
+
+def old_add_table(doc, rows, autofit_mode='window'):
+    """Bản trước đây, giữ lại để so sánh kết quả và tốc độ."""
+    num_cols = len(rows[0])
+    table = doc.add_table(rows=len(rows), cols=num_cols)
+    table.style = 'Table Grid'
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    for row_idx, cells in enumerate(rows):
+        for col_idx, (is_header, text) in enumerate(cells):
+            if col_idx < num_cols:
+                table_cell = table.rows[row_idx].cells[col_idx]
+                table_cell.text = text
+                if row_idx == 0 or is_header:
+                    old_set_cell_shading(table_cell, "4472C4")
+                    for para in table_cell.paragraphs:
+                        for run in para.runs:
+                            run.bold = True
+                            run.font.color.rgb = RGBColor(255, 255, 255)
+                elif col_idx == 0:
+                    old_set_cell_shading(table_cell, "D6DCE5")
+                    for para in table_cell.paragraphs:
+                        for run in para.runs:
+                            run.bold = True
+                elif row_idx % 2 == 0:
+                    old_set_cell_shading(table_cell, "F2F2F2")
+    set_table_borders(table, len(rows))
+    set_table_autofit(table, autofit_mode)
+    doc.add_paragraph()
+
+
+def make_rows(n):
+    rows = [[(True, "Camera"), (True, "FPS"), (True, "Trạng thái"), (True, "Ghi chú")]]
+    for r in range(n):
+        # Có dòng thiếu cột, dòng thừa cột, cell rỗng, cell có tab / khoảng trắng
+        cells = [(False, f"cam_{r}"), (False, str(25 + r % 5)), (False, "OK" if r % 7 else ""),
+                 (False, f"ghi\tchú {r}" if r % 11 == 0 else f"ghi  chú {r}")]
+        if r % 13 == 0:
+            cells = cells[:2]
+        elif r % 17 == 0:
+            cells.append((False, "thừa"))
+        elif r % 19 == 0:
+            cells[1] = (True, "th giữa bảng")
+        rows.append(cells)
+    return rows
+
+
+def build(fn, rows):
+    doc = Document()
+    t0 = time.perf_counter()
+    fn(doc, rows)
+    elapsed = time.perf_counter() - t0
+    buf = io.BytesIO()
+    doc.save(buf)
+    with zipfile.ZipFile(buf) as z:
+        return elapsed, z.read("word/document.xml")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sizes = [int(a) for a in args] or [100, 1000, 10000]
+    with_old = "--old" in sys.argv
+    print(f"{'rows':>6} {'new (s)':>9} {'µs/row':>8}" + (f" {'old (s)':>9} {'speedup':>8}" if with_old else ""))
+    for n in sizes:
+        rows = make_rows(n)
+        t_new, got = build(add_table, rows)
+        line = f"{n:>6} {t_new:>9.3f} {t_new / n * 1e6:>8.1f}"
+        if with_old:
+            t_old, ref = build(old_add_table, rows)
+            assert got == ref, f"{n} dòng: document.xml khác bản cũ"
+            line += f" {t_old:>9.3f} {t_old / t_new:>7.1f}x"
+        print(line)
@@ -0,0 +1,74 @@
+# Benchmark: chi phí mỗi file của bước tạo document (Document() + trang A4 + style Normal như trước)
+# so với clone document gốc đã cache (new_document), và thời gian convert batch file .md nhỏ.
+# Kiểm tra mọi part của .docx giống hệt cách tạo cũ.
+#
+#   python dev/bench_md2w_template.py [num_files]
+import io
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from bench_md2w_jobs import make_report
+from tatools01.md_word import convert_md_to_word as md2w
+
+
+def old_new_document(template=None):
+    """Cách tạo trước đây: mở template mặc định từ đĩa và thiết lập lại cho mỗi file."""
+    doc = md2w.Document()
+    md2w.setup_page_format(doc)
+    style = doc.styles['Normal']
+    style.font.name = 'Cambria'
+    style.font.size = md2w.Pt(12)
+    return doc
+
+
+def docx_parts(doc):
+    buf = io.BytesIO()
+    doc.save(buf)
+    with zipfile.ZipFile(buf) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def per_call_ms(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def convert_batch(md_files):
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for f in md_files:
+            md2w.convert_md_file_to_docx(f, f.with_suffix(".docx"), engine="direct")
+    return (time.perf_counter() - t0) / len(md_files) * 1000
+
+
+if __name__ == "__main__":
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    assert docx_parts(md2w.new_document()) == docx_parts(old_new_document()), "new_document khác cách tạo cũ"
+
+    t_old = per_call_ms(old_new_document, 50)
+    t_new = per_call_ms(md2w.new_document, 50)
+    print(f"tạo document:   cũ {t_old:6.2f} ms/file   cache+clone {t_new:6.2f} ms/file   {t_old / t_new:.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        md_files = []
+        for i in range(num_files):
+            path = Path(tmp) / f"note_{i:04d}.md"
+            path.write_text(make_report(i, sections=1, table_rows=3), encoding="utf-8")
+            md_files.append(path)
+        new_document = md2w.new_document
+        md2w.new_document = old_new_document
+        try:
+            t_old = convert_batch(md_files)
+        finally:
+            md2w.new_document = new_document
+        t_new = convert_batch(md_files)
+        print(f"convert {num_files} file nhỏ: cũ {t_old:6.2f} ms/file   cache+clone {t_new:6.2f} ms/file   "
+              f"{t_old / t_new:.2f}x")
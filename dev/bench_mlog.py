@@ -0,0 +1,40 @@
+# Benchmark: số lần gọi mlog/giây, ghi đồng bộ (mở/append/đóng file + print mỗi dòng)
+# so với async_log (format + enqueue, writer thread ghi theo lô).
+# Console được chuyển vào /dev/null để chỉ đo phần logging.
+#
+#   python dev/bench_mlog.py [num_calls]
+import os
+import sys
+import time
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, log_writer
+
+os.environ.setdefault("DEBUG_MODE", "2")
+
+
+def run(params, n):
+    t0 = time.perf_counter()
+    for i in range(n):
+        params.mlog("frame", i, "processed", level="info")
+    t_calls = time.perf_counter() - t0
+    log_writer.flush()
+    return t_calls, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'mode':>6} {'calls/s':>12} {'calls (s)':>10} {'+flush (s)':>11} {'lines':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("sync", "async"):
+            TactParameters.async_log = mode == "async"
+            params = TactParameters(ModuleName="Bench", logdir=os.path.join(tmp, mode))
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                t_calls, t_total = run(params, n)
+            with open(params.getLogfilename(), encoding="utf-8") as f:
+                lines = sum(1 for _ in f)
+            assert lines == n, f"{mode}: {lines} dòng, cần {n}"
+            print(f"{mode:>6} {n / t_calls:>12,.0f} {t_calls:>10.3f} {t_total:>11.3f} {lines:>7}")
+    log_writer.close()
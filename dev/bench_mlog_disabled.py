@@ -0,0 +1,52 @@
+# Micro-benchmark: chi phí 1 lời gọi mlog bị lọc bởi DEBUG_MODE (trace khi DEBUG_MODE=2),
+# so với bản cũ (dựng level_map mỗi lần gọi) và các cách gọi: f-string, %-style trễ, Lazy,
+# kiểm tra is_enabled() trước.
+#
+#   python dev/bench_mlog_disabled.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, Lazy
+
+
+def old_mlog(self, *args, level=None, **kwargs):
+    """Phần early-return của bản trước đây, giữ lại để so sánh."""
+    level_map = {
+        'critical': 0, 'error': 0,
+        'warning': 1, 'info': 1,
+        'debug': 2,
+        'trace': 3
+    }
+    numeric_level = 2
+    if isinstance(level, int):
+        numeric_level = level
+    elif isinstance(level, str):
+        numeric_level = level_map.get(level.lower(), 2)
+    if self.DEBUG_MODE < numeric_level:
+        return
+
+
+if __name__ == "__main__":
+    p = TactParameters()
+    p.DEBUG_MODE = 2
+    boxes = [(i, i * 2, 640, 480) for i in range(20)]
+    fps = 29.97
+
+    cases = {
+        "old, constant": lambda: old_mlog(p, "frame done", level="trace"),
+        "new, constant": lambda: p.mlog("frame done", level="trace"),
+        "old, f-string": lambda: old_mlog(p, f"fps={fps:.1f} boxes={boxes}", level="trace"),
+        "new, f-string": lambda: p.mlog(f"fps={fps:.1f} boxes={boxes}", level="trace"),
+        "new, %-style": lambda: p.mlog("fps=%.1f boxes=%s", fps, boxes, level="trace", fmt=True),
+        "new, Lazy": lambda: p.mlog(Lazy(str, boxes), level="trace"),
+        "new, int level": lambda: p.mlog("fps=%.1f boxes=%s", fps, boxes, level=3, fmt=True),
+        "is_enabled guard": lambda: p.is_enabled("trace") and p.mlog(f"fps={fps:.1f} boxes={boxes}", level="trace"),
+        "empty lambda": lambda: None,
+    }
+    n = 200000
+    print(f"{'case':>18} {'ns/call':>9}")
+    for name, fn in cases.items():
+        t = min(timeit.repeat(fn, number=n, repeat=5)) / n * 1e9
+        print(f"{name:>18} {t:>9.0f}")
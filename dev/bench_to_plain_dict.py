@@ -0,0 +1,86 @@
+# Micro-benchmark: TactParameters._to_plain_dict (iterative, memoized) so với bản đệ quy cũ
+# trên các loại dữ liệu: wide (nhiều key), deep (lồng sâu), objects (nhiều nested class
+# instance), shared (object dùng chung).
+#
+#   python dev/bench_to_plain_dict.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, DotDict
+
+
+def old_to_plain_dict(obj):
+    """Bản đệ quy trước đây, giữ lại để so sánh kết quả và tốc độ."""
+    if obj is None:
+        return None
+    if isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [old_to_plain_dict(item) for item in obj]
+    if isinstance(obj, dict):
+        return {k: old_to_plain_dict(v) for k, v in obj.items()}
+    if isinstance(obj, DotDict):
+        return old_to_plain_dict(obj.to_dict())
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        result = {}
+        for key in dir(obj):
+            if key.startswith('_'):
+                continue
+            value = getattr(obj, key)
+            if callable(value):
+                continue
+            result[key] = old_to_plain_dict(value)
+        return result
+    return str(obj)
+
+
+class clsCamera:
+    ip = "192.168.1.10"
+    port = 554
+    roi = [0, 0, 1920, 1080]
+
+    def url(self):
+        return f"rtsp://{self.ip}"
+
+
+def make_wide(n=20000):
+    return {f"key_{i}": {"v": i, "f": i / 3, "s": str(i), "l": [i, i + 1]} for i in range(n)}
+
+
+def make_deep(depth=800):
+    node = {"leaf": 1}
+    for i in range(depth):
+        node = {"level": i, "child": node, "cam": clsCamera()}
+    return node
+
+
+def make_objects(n=2000):
+    return {"cameras": [clsCamera() for _ in range(n)]}
+
+
+def make_shared(n=200):
+    shared = {"classes": [f"class_{i}" for i in range(200)], "cam": clsCamera()}
+    return {"modules": [{"id": i, "cfg": shared, "dot": DotDict({"x": {"y": i}})} for i in range(n)]}
+
+
+if __name__ == "__main__":
+    p = TactParameters()
+    fixtures = {"wide": make_wide(), "deep": make_deep(), "objects": make_objects(), "shared": make_shared()}
+    print(f"{'fixture':>8} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>8}")
+    for name, data in fixtures.items():
+        if name != "deep":
+            assert TactParameters._plain_equal(old_to_plain_dict(data), p._to_plain_dict(data)), name
+        n = 5
+        t_new = min(timeit.repeat(lambda: p._to_plain_dict(data), number=n, repeat=3)) / n * 1000
+        try:
+            t_old = min(timeit.repeat(lambda: old_to_plain_dict(data), number=n, repeat=3)) / n * 1000
+            print(f"{name:>8} {t_old:>10.2f} {t_new:>10.2f} {t_old / t_new:>7.1f}x")
+        except RecursionError:
+            print(f"{name:>8} {'Recursion':>10} {t_new:>10.2f} {'-':>8}")
+
+    # Vòng tham chiếu: bản cũ RecursionError, bản mới thay bằng marker
+    a = {"name": "a"}
+    a["self"] = a
+    print("cycle:", p._to_plain_dict(a))
@@ -0,0 +1,62 @@
+# Benchmark: parse YAML (ruamel round-trip) so với đọc snapshot nhị phân (marshal)
+# cho file tham số 1 KB, 1 MB, 20 MB.
+#
+#   python dev/bench_yaml_snapshot.py            # 1KB 1MB 20MB
+#   python dev/bench_yaml_snapshot.py 1KB 1MB    # chọn kích thước
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, yaml_cache
+
+SIZES = {"1KB": 1 << 10, "1MB": 1 << 20, "20MB": 20 << 20}
+
+
+def make_yaml(path, target_bytes):
+    """Sinh file YAML giống file tham số thật: nhiều module, list class, ROI theo camera."""
+    with open(path, "w", encoding="utf-8") as f:
+        i = 0
+        while f.tell() < target_bytes:
+            f.write(f"Module_{i}:\n")
+            f.write(f"    threshold: {0.1 + i % 9 / 10}\n")
+            f.write(f"    enabled: {'true' if i % 2 else 'false'}\n")
+            f.write("    classes:\n")
+            for c in range(10):
+                f.write(f"      - class_{i}_{c}\n")
+            f.write("    roi:\n")
+            for cam in range(3):
+                f.write(f"        cam_{cam}: [{cam}, {cam * 10}, 640, 480]\n")
+            i += 1
+
+
+def timed_load(params, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        yaml_cache.invalidate()
+        t0 = time.perf_counter()
+        params._read_yaml_safe(path)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(SIZES)
+    params = TactParameters()
+    print(f"{'size':>6} {'parse (s)':>10} {'snapshot (s)':>13} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            path = os.path.join(tmp, f"params_{name}.yml")
+            make_yaml(path, SIZES[name])
+            repeat = 5 if SIZES[name] <= SIZES["1MB"] else 1
+
+            TactParameters.use_yaml_snapshot = False
+            t_parse = timed_load(params, path, repeat)
+
+            TactParameters.use_yaml_snapshot = True
+            yaml_cache.invalidate()
+            params._read_yaml_safe(path)  # tạo snapshot
+            t_snap = timed_load(params, path, repeat)
+
+            print(f"{name:>6} {t_parse:>10.4f} {t_snap:>13.4f} {t_parse / t_snap:>7.0f}x")
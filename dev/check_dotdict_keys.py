@@ -0,0 +1,84 @@
+# Kiểm tra: key trùng tên method của Mapping (items, values, get, to_dict) vẫn trả về giá trị
+# đã lưu khi truy cập bằng dot, cả lần đầu (chưa có file) lẫn sau khi load lại từ file;
+# key 'keys' đọc bằng obj['keys'] và dict(obj) / {**obj} / dict.update(obj) vẫn chạy.
+#
+#   python dev/check_dotdict_keys.py
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("DEBUG_MODE", "2")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, DotDict
+
+EXPECTED = {"items": ["cam_1", "cam_2"], "keys": 3, "values": {"a": 1}, "get": "x", "to_dict": False, "name": "A"}
+# Truy cập bằng dot trả về giá trị; 'keys' luôn là method (giao thức dict()/**)
+ATTR_KEYS = [k for k in EXPECTED if k != "keys"]
+
+
+class KeyParams(TactParameters):
+    def __init__(self, file_path):
+        super().__init__(ModuleName="DotDictKeys")
+
+        class clsA:
+            items = ["cam_1", "cam_2"]
+            keys = 3
+            values = {"a": 1}
+            get = "x"
+            to_dict = False
+            name = "A"
+
+        self.A = clsA()
+        self.load_then_save_to_yaml(file_path=file_path)
+
+
+def plain(value):
+    return dict(value) if isinstance(value, DotDict) else value
+
+
+def check(p, label):
+    ok = True
+    # Lần đầu p.A vẫn là instance của clsA; sau khi load lại từ file là DotDict
+    is_dotdict = isinstance(p.A, DotDict)
+    for key, want in EXPECTED.items():
+        got = plain(getattr(p.A, key)) if key in ATTR_KEYS or not is_dotdict else plain(p.A[key])
+        if got != want:
+            ok = False
+            print(f"  ✗ {label}: A.{key} = {got!r}, mong đợi {want!r}")
+    # dict() / ** / update gọi obj.keys() rồi obj[key]
+    for how, build in () if not is_dotdict else (("dict(A)", lambda: dict(p.A)), ("{**A}", lambda: {**p.A}),
+                       ("dict.update(A)", lambda: _update(p.A))):
+        try:
+            got = {k: plain(v) for k, v in build().items()}
+        except Exception as e:
+            got = e
+        if got != EXPECTED:
+            ok = False
+            print(f"  ✗ {label}: {how} = {got!r}")
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def _update(d):
+    out = {}
+    out.update(d)
+    return out
+
+
+if __name__ == "__main__":
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "params.yml")
+        all_ok &= check(KeyParams(path), "lần đầu (tạo file)")
+        p = KeyParams(path)
+        all_ok &= check(p, "load lại từ file")
+        # Method của Mapping vẫn dùng được qua dict()/['key']/DotDict.items/DotDict.get
+        all_ok &= isinstance(p.A, DotDict) and p.A.values["a"] == 1
+        all_ok &= dict(DotDict.items(p.A))["keys"] == 3 and DotDict.get(p.A, "get") == "x"
+        all_ok &= sorted(p.A.keys()) == sorted(EXPECTED)
+        d = DotDict({"keys": [1, 2], "items": 3, "get": 4})
+        all_ok &= dict(d) == {**d} == {"keys": [1, 2], "items": 3, "get": 4}
+        all_ok &= d["keys"] == [1, 2] and d.items == 3 and d.get == 4
+        all_ok &= DotDict({"k": 1}).get("k") == 1 and DotDict({"k": 1}) == {"k": 1}
+    print("✓ DOTDICT KEYS OK" if all_ok else "✗ DOTDICT KEYS FAILED")
+    sys.exit(0 if all_ok else 1)
@@ -0,0 +1,96 @@
+# Kiểm tra parity: engine direct (cây Markdown -> docx) phải cho ra word/document.xml giống hệt
+# engine html (Markdown -> HTML -> BeautifulSoup -> docx) trên bộ mẫu và các file .md của repo;
+# chế độ --stream (cắt khối ở mọi chỗ được phép cắt) phải giống hệt engine direct.
+#
+#   python dev/check_md2w_engines.py              # bộ mẫu + README.md
+#   python dev/check_md2w_engines.py a.md b.md    # thêm file .md bất kỳ
+import os
+import sys
+import glob
+import difflib
+import zipfile
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.md_word.convert_md_to_word import convert_md_file_to_docx, convert_md_stream
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+SAMPLES = {
+    "inline": "Văn bản **đậm**, *nghiêng*, `code <x> & y`, [link](http://a.b) và ***cả hai***.\n"
+              "Dòng thứ 2 (nl2br)\ncó **`code trong đậm`** và \\*escape\\* 50% a<b AT&T.\n",
+    "headings": "# H1 *em*\n\n## H2 `code`\n\n### H3\n\n#### H4\n\n##### H5\n\n###### H6 [l](u)\n",
+    "lists": "- a **b**\n- c\n    - nested 1\n    - nested *2*\n- d\n\n1. one\n2. two `x`\n\n"
+             "* item\n\n    đoạn 2 trong item\n",
+    "code": "```python\nx = 1 < 2 and \"s\" & 'q'\n\n\nprint(x)\n```\n\n~~~\nno lang\n~~~\n\n"
+            "    indented <code>\n    line 2\n\nsau code\n\n```\n\n  \n\tblank lines\n\n\n```\n\n"
+            "    :::python\n    x = 1\n\n    #!python\n    y = 2\n\n    #!/usr/bin/python\n    z = 3\n",
+    "table": "| Camera | FPS | *Ghi chú* |\n|:---|---:|:---:|\n| cam_1 | 25 | **ok** |\n"
+             "| cam_2 | | `x<y` |\n| cam_3 | 30 | thừa | cột |\n\n| chỉ header |\n|---|\n",
+    "blockquote": "> trích dẫn **đậm**\n> dòng 2\n>\n> đoạn 2\n\n---\n\n***\n",
+    "raw_html": "<div>raw <b>html</b></div>\n\ninline <span>span</span> &copy; &amp; &#169;\n\n"
+                "<table><tr><th>h</th></tr><tr><td>c</td></tr></table>\n",
+    "raw_html_blocks": "Trước block.\n\n<h2>RAWH2_1 <b>đậm</b></h2>\n\n"
+                       "<table><tr><th>RAWTH_2</th></tr><tr><td>RAWTD_3</td></tr></table>\n\n"
+                       "```\nRAWCODE_4 <x>\n```\n\n<p>RAWP_5</p>\n\nSau block.\n",
+    "toc": "[TOC]\n\n# A\n\n## B\n",
+    "empty": "",
+    "mixed": "# Báo cáo\n\nĐoạn *mở đầu*.\n\n- list\n\n```\ncode\n```\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\n> quote\n",
+}
+
+# Text phải có trong output của mọi engine: block HTML thô (htmlStash của python-markdown)
+# không được bị bỏ qua âm thầm, kể cả khi mọi engine cùng bỏ (parity vẫn OK)
+EXPECTED_TEXT = {
+    "raw_html_blocks": ["RAWH2_1", "RAWTH_2", "RAWTD_3", "RAWCODE_4", "RAWP_5", "Trước block.", "Sau block."],
+}
+
+
+def document_xml(md_path, engine):
+    out = md_path.with_name(f"{md_path.stem}.{engine}.docx")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if engine == "stream":
+            convert_md_stream(md_path, out, chunk_chars=1)
+        else:
+            convert_md_file_to_docx(md_path, out, engine=engine)
+    with zipfile.ZipFile(out) as z:
+        return z.read("word/document.xml").decode("utf-8")
+
+
+def check(md_path, name):
+    ok = True
+    xml = {engine: document_xml(md_path, engine) for engine in ("html", "direct", "stream")}
+    for engine, got in xml.items():
+        lost = [text for text in EXPECTED_TEXT.get(name, ()) if text not in got]
+        if lost:
+            ok = False
+            print(f"✗ {name}: {engine} thiếu {lost}")
+    for ref_engine, engine in (("html", "direct"), ("direct", "stream")):
+        ref, got = xml[ref_engine], xml[engine]
+        if got == ref:
+            continue
+        ok = False
+        print(f"✗ {name}: {engine} khác {ref_engine}")
+        diff = difflib.unified_diff(ref.replace("><", ">\n<").splitlines(), got.replace("><", ">\n<").splitlines(),
+                                    ref_engine, engine, lineterm="", n=1)
+        for line in list(diff)[:30]:
+            print(f"    {line}")
+    if ok:
+        print(f"✓ {name}")
+    return ok
+
+
+if __name__ == "__main__":
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in SAMPLES.items():
+            path = Path(tmp) / f"{name}.md"
+            path.write_text(text, encoding="utf-8")
+            all_ok &= check(path, name)
+        for src in sorted(glob.glob(os.path.join(ROOT, "*.md"))) + sys.argv[1:]:
+            path = Path(tmp) / Path(src).name
+            path.write_bytes(Path(src).read_bytes())
+            all_ok &= check(path, os.path.relpath(src, ROOT))
+    print("✓ PARITY OK" if all_ok else "✗ PARITY FAILED")
+    sys.exit(0 if all_ok else 1)
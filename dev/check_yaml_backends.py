@@ -0,0 +1,155 @@
+# Kiểm tra parity: mọi backend đọc YAML (pyyaml, ruamel-safe, roundtrip) phải cho ra
+# cùng plain dict và cùng kết quả merge của TactParameters.
+#
+#   python dev/check_yaml_backends.py
+import os
+import sys
+import glob
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, YAML_READ_BACKENDS, yaml_cache
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+TRICKY = """\
+Module 01:
+    bool_12: true
+    bool_11_words: [yes, no, on, off, y, n]
+    ints: [0, -5, +7, 017, 0o17, 0x1F, 0b101, 1_000]
+    floats: [3.14, -0.5, 1e3, 1.5e-3, .5, .inf, -.inf]
+    sexagesimal: [1:20, 12:30:00]
+    nulls: [~, null, Null, ]
+    date: 2024-01-01
+    datetime: 2024-01-01 12:30:45
+    quoted: ["123", '4.5', "true"]
+    unicode: "Chương trình chatbot"
+    # Không đưa "!!str 12" vào đây: round-trip trả về TaggedScalar (thành dict rác sau
+    # _to_plain_dict), còn backend safe trả về '12' đúng như mong đợi.
+    multiline: |
+        line 1
+        line 2
+    nested:
+        a: {b: [1, {c: d}]}
+        1: int key
+    base: &base
+        host: localhost
+        port: 5432
+    derived:
+        <<: *base
+        port: 6543
+    list_anchor: &l [a, b]
+    anchored: &anchored {h: 1, l: [1, 2], d: {x: 1}}
+    aliased: *anchored
+    aliased_list: *l
+    nested_alias: {inner: *anchored}
+    empty_list: []
+    empty_dict: {}
+Module 02:
+    HD:
+      - Chương trình 02
+    in_var: 2
+"""
+
+
+class ParityParams(TactParameters):
+    def __init__(self, ModuleName, file_path):
+        super().__init__(ModuleName=ModuleName)
+        self.bool_12 = False
+        self.ints = []
+        self.nested = {"a": {"b": [], "x": "default"}}
+
+        class clsDB:
+            host = "127.0.0.1"
+            port = 1
+            user = "admin"
+
+        self.derived = clsDB()
+        self.anchored = {"h": 0}
+        self.only_default = 42
+        self.load_then_save_to_yaml(file_path=file_path, save2file=False)
+
+
+def load_with(backend, path):
+    TactParameters.yaml_read_backend = backend
+    yaml_cache.invalidate()
+    return TactParameters()._read_yaml_safe(path)
+
+
+def merged_with(backend, path, module):
+    TactParameters.yaml_read_backend = backend
+    yaml_cache.invalidate()
+    p = ParityParams(module, path)
+    return p._to_plain_dict(p._get_params())
+
+
+def check_anchors(path, module):
+    """Anchor/alias trong file phải thành object riêng sau khi load: sửa 1 chỗ không làm đổi chỗ khác."""
+    ok = True
+    for b in YAML_READ_BACKENDS:
+        for lazy in (False, True):
+            TactParameters.yaml_read_backend = b
+            TactParameters.lazy_yaml_load = lazy
+            yaml_cache.invalidate()
+            p = ParityParams(module, path)
+            pairs = [(p.anchored, p.aliased), (p.anchored["l"], p.aliased["l"]),
+                     (p.anchored["d"], p.nested_alias["inner"]["d"]), (p.list_anchor, p.aliased_list)]
+            shared = [i for i, (x, y) in enumerate(pairs) if x is y or x != y]
+            p.aliased["l"].append(3)
+            if shared or p.anchored["l"] != [1, 2]:
+                ok = False
+                print(f"  ✗ {b}{' (lazy)' if lazy else ''}: giá trị anchor/alias dùng chung object {shared}")
+    TactParameters.lazy_yaml_load = False
+    print(f"{'✓' if ok else '✗'} anchor/alias không dùng chung object")
+    return ok
+
+
+def check_file(path, modules=()):
+    backends = list(YAML_READ_BACKENDS)
+    ref = load_with("roundtrip", path)
+    ok = True
+    for b in backends:
+        got = load_with(b, path)
+        if got != ref or not TactParameters._plain_equal(got, ref):
+            ok = False
+            print(f"  ✗ {b}: plain dict khác roundtrip")
+            for k in ref:
+                if k not in got or got[k] != ref[k]:
+                    print(f"      {k}: roundtrip={ref[k]!r} {b}={got.get(k)!r}")
+    for m in modules:
+        ref_m = merged_with("roundtrip", path, m)
+        for b in backends:
+            if not TactParameters._plain_equal(merged_with(b, path, m), ref_m):
+                ok = False
+                print(f"  ✗ {b}: kết quả merge của '{m}' khác roundtrip")
+    print(f"{'✓' if ok else '✗'} {os.path.relpath(path, ROOT)}")
+    return ok
+
+
+if __name__ == "__main__":
+    print(f"Backends: {', '.join(YAML_READ_BACKENDS)}")
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        tricky = os.path.join(tmp, "tricky.yml")
+        with open(tricky, "w", encoding="utf-8") as f:
+            f.write(TRICKY)
+        all_ok &= check_file(tricky, modules=("Module 01", "Module 02", "Missing"))
+        all_ok &= check_anchors(tricky, "Module 01")
+
+        for path in sorted(glob.glob(os.path.join(ROOT, "*.yml")) + glob.glob(os.path.join(ROOT, "dev", "*.y*ml"))):
+            all_ok &= check_file(path)
+
+        # Tốc độ đọc trên file ~300 KB
+        big = os.path.join(tmp, "big.yml")
+        with open(big, "w", encoding="utf-8") as f:
+            for i in range(1500):
+                f.write(f"Module_{i}:\n    threshold: 0.{i % 10}\n    classes: [a, b, c, d]\n")
+                f.write(f"    roi: {{x: {i}, y: 0, w: 640, h: 480}}\n    enabled: true\n")
+        for b in YAML_READ_BACKENDS:
+            t0 = time.perf_counter()
+            load_with(b, big)
+            print(f"  {b:>12}: {time.perf_counter() - t0:.3f}s")
+
+    print("✓ PARITY OK" if all_ok else "✗ PARITY FAILED")
+    sys.exit(0 if all_ok else 1)
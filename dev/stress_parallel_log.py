@@ -0,0 +1,75 @@
+# Stress test: nhiều process cùng mlog vào CÙNG một file log với log_multiprocess = True
+# (ghi đồng bộ và async_log). Sau khi chạy, mọi dòng phải nguyên vẹn và không thiếu dòng nào.
+# Dòng log dài (vài KB) để vượt buffer 1 lần write và dễ lộ lỗi xen dòng.
+#
+#   python dev/stress_parallel_log.py [num_procs] [lines_per_proc]
+import os
+import sys
+import zlib
+import tempfile
+import contextlib
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters, log_writer
+
+
+def worker(args):
+    proc_idx, n_lines, logdir, async_log, barrier = args
+    os.environ["DEBUG_MODE"] = "2"
+    TactParameters.log_multiprocess = True
+    TactParameters.async_log = async_log
+    params = TactParameters(ModuleName=f"P{proc_idx:02d}", logdir=logdir)
+    params.DEBUG_MODE = 2
+    barrier.wait()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(n_lines):
+            payload = f"{proc_idx}-{i}-" * (200 + (i * 37) % 1500)
+            params.mlog(f"i={i} crc={zlib.crc32(payload.encode())} payload={payload}", level="info")
+        log_writer.flush()
+
+
+def check(log_file, num_procs, n_lines):
+    seen = {f"P{p:02d}": set() for p in range(num_procs)}
+    bad = 0
+    with open(log_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                module = line.split("] ", 1)[0].rsplit("[", 1)[1]
+                body = line.split("[INFO] ", 1)[1].rstrip("\n")
+                i_part, crc_part, payload = body.split(" ", 2)
+                i, crc = int(i_part[2:]), int(crc_part[4:])
+                ok = payload.startswith("payload=") and zlib.crc32(payload[8:].encode()) == crc
+            except (IndexError, ValueError):
+                ok = False
+            if ok and module in seen:
+                seen[module].add(i)
+            else:
+                bad += 1
+    missing = sum(n_lines - len(v) for v in seen.values())
+    return bad, missing
+
+
+def run(num_procs=16, n_lines=300):
+    ctx = mp.get_context("spawn")
+    for async_log in (False, True):
+        mode = "async" if async_log else "sync"
+        with tempfile.TemporaryDirectory() as tmp:
+            barrier = ctx.Barrier(num_procs)
+            procs = [ctx.Process(target=worker, args=((i, n_lines, tmp, async_log, barrier),))
+                     for i in range(num_procs)]
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join()
+            assert all(p.exitcode == 0 for p in procs), "Có worker bị lỗi"
+            log_file = TactParameters(logdir=tmp).getLogfilename()
+            bad, missing = check(log_file, num_procs, n_lines)
+            assert bad == 0, f"{mode}: {bad} dòng bị hỏng/xen nhau"
+            assert missing == 0, f"{mode}: mất {missing} dòng"
+            print(f"✓ OK ({mode}): {num_procs} process x {n_lines} dòng, không dòng nào hỏng hay mất")
+
+
+if __name__ == "__main__":
+    argv = [int(a) for a in sys.argv[1:3]]
+    run(*argv)
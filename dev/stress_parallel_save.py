@@ -0,0 +1,59 @@
+# Stress test: nhiều process cùng lúc load_then_save_to_yaml các module khác nhau
+# vào CÙNG một file YAML. Sau khi chạy xong, file phải parse được và đủ mọi module.
+#
+#   python dev/stress_parallel_save.py [num_procs] [modules_per_proc]
+import os
+import sys
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from tatools01.ParamsBase import TactParameters
+
+
+class WorkerParams(TactParameters):
+    def __init__(self, ModuleName, file_path):
+        super().__init__(ModuleName=ModuleName)
+        self.worker = ModuleName
+        self.values = list(range(50))
+        self.nested = {"a": {"b": {"c": ModuleName}}}
+        self.load_then_save_to_yaml(file_path=file_path)
+
+
+def worker(args):
+    proc_idx, n_modules, file_path, barrier = args
+    barrier.wait()
+    for j in range(n_modules):
+        WorkerParams(f"P{proc_idx:02d}_M{j:02d}", file_path)
+
+
+def run(num_procs=16, modules_per_proc=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = os.path.join(tmp, "shared.yml")
+        barrier = mp.Barrier(num_procs)
+        procs = [
+            mp.Process(target=worker, args=((i, modules_per_proc, fn, barrier),))
+            for i in range(num_procs)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        assert all(p.exitcode == 0 for p in procs), "Có worker bị lỗi"
+
+        from ruamel.yaml import YAML
+        with open(fn, "r", encoding="utf-8") as f:
+            data = YAML(typ="safe").load(f)
+        expected = {f"P{i:02d}_M{j:02d}" for i in range(num_procs) for j in range(modules_per_proc)}
+        missing = expected - set(data)
+        assert not missing, f"Mất {len(missing)} module: {sorted(missing)[:10]}"
+        for name in expected:
+            assert data[name]["nested"]["a"]["b"]["c"] == name, f"Module {name} bị ghi sai"
+        leftovers = [f for f in os.listdir(tmp) if f.endswith(".tmp")]
+        assert not leftovers, f"Còn file tạm: {leftovers}"
+        print(f"✓ OK: {num_procs} process x {modules_per_proc} module, không mất module nào")
+
+
+if __name__ == "__main__":
+    argv = [int(a) for a in sys.argv[1:3]]
+    run(*argv)
@@ -1,36 +1,772 @@
 import os
+import io
+import re
+import sys
+import copy
+import time
+import stat
+import errno
+import gzip
+import json
+import queue
+import shutil
+import sqlite3
+import atexit
+import marshal
+import fnmatch
+import hashlib
+import threading
 from os.path import join, exists, basename
-from datetime import datetime
-from typing import Any, Optional, List
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Mapping
+from typing import Any, Callable, Optional, List
+import weakref
 from ruamel.yaml import YAML
 from pprint import pprint as pp
 
+try:
+    import yaml as pyyaml  # PyYAML (tùy chọn): chỉ dùng cho đường đọc nhanh
+except ImportError:
+    pyyaml = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 yaml = YAML()
 yaml.indent(mapping=4, sequence=4, offset=2)
+# _to_plain_dict dùng chung kết quả cho object dùng chung → không sinh &id001/*id001 khi ghi
+yaml.representer.ignore_aliases = lambda data: True
 
 version = "3.1.0"
 
-class DotDict:
-    """Dict có thể truy cập bằng dot notation: obj.key thay vì obj['key']"""
-    
+
+# ==================== YAML read backends ====================
+# Đường đọc chỉ cần plain dict (comment/thứ tự bị bỏ ngay bởi _to_plain_dict), nên không
+# cần loader round-trip. Đường ghi vẫn dùng `yaml` (round-trip) để giữ định dạng/indent.
+
+def _load_roundtrip(text: str) -> Any:
+    return yaml.load(text)
+
+
+def _load_ruamel_safe(text: str) -> Any:
+    # Tạo instance mới mỗi lần: YAML() giữ state parser nên không an toàn giữa các thread
+    return YAML(typ="safe").load(text)
+
+
+YAML_READ_BACKENDS = {
+    "roundtrip": _load_roundtrip,
+    "ruamel-safe": _load_ruamel_safe,
+}
+
+if pyyaml is not None:
+    class _Yaml12Loader(getattr(pyyaml, "CSafeLoader", pyyaml.SafeLoader)):
+        """
+        Loader PyYAML (LibYAML nếu có) nhưng resolve scalar theo YAML 1.2 như ruamel:
+        yes/no/on/off là string, 017 là 17, 1:20 là string...
+        """
+        yaml_implicit_resolvers = {}
+
+    _YAML12_RESOLVERS = [
+        ("tag:yaml.org,2002:bool",
+         r"^(?:true|True|TRUE|false|False|FALSE)$", "tTfF"),
+        ("tag:yaml.org,2002:float",
+         r"""^(?:[-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+]?[0-9]+)?
+         |[-+]?(?:[0-9][0-9_]*)(?:[eE][-+]?[0-9]+)
+         |[-+]?\.[0-9_]+(?:[eE][-+][0-9]+)?
+         |[-+]?\.(?:inf|Inf|INF)
+         |\.(?:nan|NaN|NAN))$""", "-+0123456789."),
+        ("tag:yaml.org,2002:int",
+         r"""^(?:[-+]?0b[0-1_]+
+         |[-+]?0o?[0-7_]+
+         |[-+]?[0-9_]+
+         |[-+]?0x[0-9a-fA-F_]+)$""", "-+0123456789"),
+        ("tag:yaml.org,2002:merge", r"^(?:<<)$", "<"),
+        ("tag:yaml.org,2002:null", r"^(?:~|null|Null|NULL|)$", ["~", "n", "N", ""]),
+        ("tag:yaml.org,2002:timestamp",
+         r"""^(?:[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]
+         |[0-9][0-9][0-9][0-9]-[0-9][0-9]?-[0-9][0-9]?
+         (?:[Tt]|[ \t]+)[0-9][0-9]?
+         :[0-9][0-9]:[0-9][0-9](?:\.[0-9]*)?
+         (?:[ \t]*(?:Z|[-+][0-9][0-9]?(?::[0-9][0-9])?))?)$""", "0123456789"),
+    ]
+    for _tag, _pattern, _first in _YAML12_RESOLVERS:
+        _Yaml12Loader.add_implicit_resolver(_tag, re.compile(_pattern, re.X), list(_first))
+
+    def _construct_yaml12_int(loader, node):
+        """Int theo YAML 1.2: 0o17 là bát phân, 017 là thập phân."""
+        value = loader.construct_scalar(node).replace("_", "")
+        sign = -1 if value[0] == "-" else 1
+        if value[0] in "+-":
+            value = value[1:]
+        for prefix, base in (("0b", 2), ("0x", 16), ("0o", 8)):
+            if value.startswith(prefix):
+                return sign * int(value[2:], base)
+        return sign * int(value)
+
+    _Yaml12Loader.add_constructor("tag:yaml.org,2002:int", _construct_yaml12_int)
+
+    def _load_pyyaml(text: str) -> Any:
+        return pyyaml.load(text, Loader=_Yaml12Loader)
+
+    YAML_READ_BACKENDS["pyyaml"] = _load_pyyaml
+
+
+def get_yaml_read_backend(name: str = "auto"):
+    """
+    Trả về (tên, hàm load) của backend đọc YAML.
+    "auto": PyYAML + LibYAML nếu có, rồi ruamel safe; không có gì thì round-trip.
+    """
+    if name == "auto":
+        if pyyaml is not None and getattr(pyyaml, "__with_libyaml__", False):
+            name = "pyyaml"
+        else:
+            name = "ruamel-safe"
+    if name not in YAML_READ_BACKENDS:
+        print(f"Warning: YAML backend '{name}' không khả dụng, dùng 'roundtrip'")
+        name = "roundtrip"
+    return name, YAML_READ_BACKENDS[name]
+
+
+def _unalias(data: Any) -> Any:
+    """
+    Tách các dict/list dùng chung trong cây đã parse (YAML anchor &a / alias *a) thành bản riêng,
+    như round-trip + convert đệ quy trước đây: sửa params.derived không được làm đổi params.base.
+    Cây không có vòng (_to_plain_dict đã thay vòng bằng string); sửa tại chỗ và trả về data.
+    """
+    seen = {id(data)}
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in list(items):
+            if not isinstance(value, (dict, list)):
+                continue
+            if id(value) in seen:
+                # Gặp lần 2: copy nông, các con của bản copy cũng đã gặp nên sẽ được copy tiếp
+                value = dict(value) if isinstance(value, dict) else list(value)
+                node[key] = value
+            seen.add(id(value))
+            stack.append(value)
+    return data
+
+class DotDict(Mapping):
+    """
+    Dict có thể truy cập bằng dot notation: obj.key thay vì obj['key']
+
+    Lưu toàn bộ dữ liệu trong 1 dict thường (cây dict lồng nhau); dict con chỉ được bọc
+    thành DotDict khi truy cập (và cache lại), nên tạo DotDict là O(số key top-level) và
+    to_dict() là O(1): trả về chính dict bên trong (view, sửa dict trả về là sửa DotDict).
+    DotDict(data) chỉ copy nông: dict con dùng chung với data.
+    Attribute ưu tiên dữ liệu: key trùng tên method (items, values, get, to_dict)
+    thì obj.key trả về giá trị đã lưu (như bản cũ), method vẫn gọi được qua
+    Mapping, vd DotDict.items(obj), dict(obj), obj['key'].
+    Riêng keys luôn là method: dict(obj), {**obj}, dict.update(obj) gọi obj.keys();
+    key dữ liệu tên 'keys' đọc bằng obj['keys'].
+    """
+
+    __slots__ = ("_data", "_children")
+
     def __init__(self, data: dict = None):
-        for key, value in (data or {}).items():
+        if isinstance(data, DotDict):
+            data = data._data
+        object.__setattr__(self, "_data", dict(data) if data else {})
+        object.__setattr__(self, "_children", {})
+
+    @classmethod
+    def _wrap(cls, data: dict) -> "DotDict":
+        """Bọc dict có sẵn, không copy."""
+        obj = cls.__new__(cls)
+        object.__setattr__(obj, "_data", data)
+        object.__setattr__(obj, "_children", {})
+        return obj
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if isinstance(value, dict):
+            child = self._children.get(key)
+            if child is None or child._data is not value:
+                child = DotDict._wrap(value)
+                self._children[key] = child
+            return child
+        return value
+
+    def __getattribute__(self, key):
+        # Key dữ liệu che method kế thừa từ Mapping (items, values, get, ...);
+        # tên bắt đầu bằng '_' (_data, _children, dunder) và keys (giao thức dict()/**)
+        # đi thẳng lookup thường
+        if key[:1] != "_" and key != "keys":
+            try:
+                value = object.__getattribute__(self, "_data")[key]
+            except KeyError:
+                return object.__getattribute__(self, key)
             if isinstance(value, dict):
-                setattr(self, key, DotDict(value))
-            else:
-                setattr(self, key, value)
-    
+                children = object.__getattribute__(self, "_children")
+                child = children.get(key)
+                if child is None or object.__getattribute__(child, "_data") is not value:
+                    child = DotDict._wrap(value)
+                    children[key] = child
+                return child
+            return value
+        return object.__getattribute__(self, key)
+
+    def __getattr__(self, key):
+        # Chỉ được gọi khi lookup thường thất bại (key dữ liệu bắt đầu bằng '_')
+        try:
+            value = self._data[key]
+        except KeyError:
+            raise AttributeError(key) from None
+        if isinstance(value, dict):
+            child = self._children.get(key)
+            if child is None or child._data is not value:
+                child = DotDict._wrap(value)
+                self._children[key] = child
+            return child
+        return value
+
+    def __setitem__(self, key, value):
+        if isinstance(value, DotDict):
+            value = value._data
+        self._data[key] = value
+        self._children.pop(key, None)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._children.pop(key, None)
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __eq__(self, other):
+        # Mapping.__eq__ gọi self.items(), có thể bị key 'items' che
+        if isinstance(other, DotDict):
+            return self._data == other._data
+        if isinstance(other, Mapping):
+            return self._data == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (DotDict, (self._data,))
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | {k for k in self._data if isinstance(k, str)})
+
     def __repr__(self):
-        return f"DotDict({self.__dict__})"
+        return f"DotDict({self._data})"
     
     def to_dict(self) -> dict:
-        result = {}
-        for k, v in self.__dict__.items():
-            if isinstance(v, DotDict):
-                result[k] = v.to_dict()
+        return self._data
+
+
+class YamlCache:
+    """
+    Cache dùng chung toàn process cho nội dung YAML đã parse.
+    Key = đường dẫn tuyệt đối, hợp lệ khi (mtime_ns, size, inode) của file không đổi.
+    Lần đọc lặp lại chỉ tốn 1 lần stat() thay vì parse lại toàn bộ file.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}  # abspath -> (signature, data)
+        self.hits = 0
+        self.misses = 0
+        self.parse_time = 0.0
+
+    @staticmethod
+    def _signature(file_path: str) -> tuple:
+        st = os.stat(file_path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def load(self, file_path: str, parser, readonly: bool = False) -> dict:
+        """
+        Trả về bản copy của nội dung đã parse; gọi parser(file_path) nếu cache miss/stale.
+        readonly=True: trả về chính object trong cache (không copy), người gọi không được sửa.
+        """
+        key = os.path.abspath(file_path)
+        sig = self._signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == sig:
+                self.hits += 1
+                return entry[1] if readonly else copy.deepcopy(entry[1])
+            self.misses += 1
+        # Parse ngoài lock để các file khác không phải chờ
+        t0 = time.perf_counter()
+        data = parser(key)
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            self.parse_time += elapsed
+            self._entries[key] = (sig, data)
+        return data if readonly else copy.deepcopy(data)
+
+    def put(self, file_path: str, data: dict) -> None:
+        """Ghi nhận nội dung vừa ghi ra file, tránh parse lại ở lần đọc sau."""
+        key = os.path.abspath(file_path)
+        try:
+            sig = self._signature(key)
+        except OSError:
+            self.invalidate(key)
+            return
+        with self._lock:
+            self._entries[key] = (sig, copy.deepcopy(data))
+
+    def invalidate(self, file_path: str = None) -> None:
+        """Xóa cache của một file, hoặc toàn bộ nếu file_path=None."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "parse_time": self.parse_time,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.parse_time = 0.0
+
+
+yaml_cache = YamlCache()
+
+_MISSING = object()
+
+
+class YamlModuleIndex:
+    """
+    Index vị trí byte của các module (key top-level) trong file YAML dạng block,
+    để đọc + parse riêng section của 1 module thay vì cả file.
+    Index được dựng lại khi (mtime_ns, size, inode) đổi; trả về None (→ caller parse
+    cả file) khi file có cấu trúc không index được (document marker, flow style...).
+    """
+
+    _BOM = b"\xef\xbb\xbf"
+    _PLAIN_KEY = re.compile(r"^([^\s#'\"\-?:,\[\]{}&*!|>%@`][^#]*?)[ \t]*:(?:[ \t]|$)")
+    _SQ_KEY = re.compile(r"^'((?:[^']|'')*)'[ \t]*:(?:[ \t]|$)")
+    _DQ_KEY = re.compile(r'^"((?:[^"\\]|\\.)*)"[ \t]*:(?:[ \t]|$)')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # abspath -> {"sig", "offsets": {name: (start, end)} | None, "parsed": {}}
+
+    @classmethod
+    def _build(cls, raw: bytes) -> Optional[dict]:
+        """Quét dòng ở cột 0 → {module: (start, end)}; None nếu không index được."""
+        offsets = {}
+        pos = len(cls._BOM) if raw.startswith(cls._BOM) else 0
+        current, start = None, pos
+        for line in raw[pos:].splitlines(keepends=True):
+            first = line[:1]
+            if first in (b"", b" ", b"\t", b"\r", b"\n", b"#"):
+                pos += len(line)
+                continue
+            text = line.decode("utf-8").rstrip("\r\n")
+            m = cls._PLAIN_KEY.match(text) or cls._SQ_KEY.match(text) or cls._DQ_KEY.match(text)
+            if m is None:
+                return None
+            if m.re is cls._SQ_KEY:
+                name = m.group(1).replace("''", "'")
+            elif m.re is cls._DQ_KEY:
+                try:
+                    name = json.loads(f'"{m.group(1)}"')
+                except ValueError:
+                    return None
+            else:
+                name = m.group(1)
+            if current is not None:
+                offsets[current] = (start, pos)
+            if name in offsets or name == current:
+                return None  # key trùng → để parser đầy đủ xử lý/báo lỗi
+            current, start = name, pos
+            pos += len(line)
+        if current is not None:
+            offsets[current] = (start, pos)
+        return offsets
+
+    def section(self, file_path: str, module_name: str, parser) -> Optional[dict]:
+        """
+        Trả về {module_name: value} nếu có, {} nếu file không có module này,
+        None nếu không dùng được index (caller nên parse cả file).
+        parser(text) -> dict parse một đoạn YAML.
+        """
+        key = os.path.abspath(file_path)
+        with open(key, "rb") as f:
+            st = os.fstat(f.fileno())
+            sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None or entry["sig"] != sig:
+                    entry = {"sig": sig, "offsets": self._build(f.read()), "parsed": {}}
+                    self._entries[key] = entry
+                if entry["offsets"] is None:
+                    return None
+                if module_name in entry["parsed"]:
+                    return {module_name: copy.deepcopy(entry["parsed"][module_name])}
+                span = entry["offsets"].get(module_name)
+                if span is None:
+                    return {}
+                f.seek(span[0])
+                text = f.read(span[1] - span[0]).decode("utf-8")
+        try:
+            data = parser(text)
+        except Exception:
+            return None  # alias tới anchor ở module khác, cú pháp lạ...
+        if not isinstance(data, dict) or list(data) != [module_name]:
+            return None
+        with self._lock:
+            if entry["sig"] == sig:
+                entry["parsed"][module_name] = data[module_name]
+        return {module_name: copy.deepcopy(data[module_name])}
+
+    def invalidate(self, file_path: str = None) -> None:
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+
+yaml_index = YamlModuleIndex()
+
+# Thời gian chờ tối đa (giây) để lấy file_lock trên Windows
+FILE_LOCK_TIMEOUT = 120
+
+
+@contextmanager
+def file_lock(file_path: str, timeout: float = None):
+    """
+    Advisory lock liên tiến trình cho file_path, dùng file phụ "<file>.lock"
+    (không lock trực tiếp file YAML vì file đó bị thay bằng os.replace khi ghi).
+    Linux: fcntl.flock; Windows: msvcrt.locking, chờ tối đa timeout giây
+    (mặc định FILE_LOCK_TIMEOUT) rồi raise TimeoutError.
+    """
+    lock_path = file_path + ".lock"
+    dir_path = os.path.dirname(lock_path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            deadline = time.monotonic() + (FILE_LOCK_TIMEOUT if timeout is None else timeout)
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    # LK_LOCK tự retry ~10s rồi báo EDEADLK/EACCES (process khác giữ lock) → thử lại;
+                    # lỗi khác (fd hỏng, ổ mạng...) thì không có lý do chờ
+                    if e.errno not in (errno.EDEADLK, errno.EACCES):
+                        raise
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Timeout chờ lock {lock_path}") from e
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
             else:
-                result[k] = v
-        return result
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+# Các batch save đang mở: abspath -> {"owner": TactParameters, "modules": {ModuleName: plain params}}
+_batch_lock = threading.Lock()
+_active_batches = {}
+
+# ==================== Log helpers ====================
+
+# Level string -> số, tính sẵn 1 lần (mlog tra trực tiếp, chỉ lower() khi gặp dạng lạ như "INFO")
+_LOG_LEVELS = {
+    'critical': 0, 'error': 0,
+    'warning': 1, 'info': 1,
+    'debug': 2,
+    'trace': 3
+}
+
+def _resolve_log_level(level) -> int:
+    """Đường chậm của việc đổi level -> số: int subclass, string viết hoa, giá trị lạ (-> DEBUG)."""
+    if isinstance(level, int):
+        return int(level)
+    if isinstance(level, str):
+        return _LOG_LEVELS.get(level.lower(), 2)
+    return 2
+
+
+# Đường dẫn file log theo ngày, dùng chung mọi instance trong process:
+# (logdir, tên file) -> (đầu ngày, đầu ngày hôm sau, đường dẫn). Chỉ tính lại khi `now` ra khỏi khoảng đó.
+_log_paths = {}
+# File log (của ngày hiện tại) mà thư mục chứa đã được tạo -> mlog không gọi makedirs mỗi dòng
+_log_dirs_ready = set()
+
+
+def _daily_log_path(base: str, now: datetime, name: str = "logs.log") -> str:
+    key = (base, name)
+    entry = _log_paths.get(key)
+    if entry is not None and entry[0] <= now < entry[1]:
+        return entry[2]
+    start = datetime(now.year, now.month, now.day)
+    path = join(base, "logs", str(now.year), str(now.month), str(now.day), name).replace("\\", "/")
+    if entry is not None:
+        _log_dirs_ready.clear()  # Sang ngày mới: thư mục mới chưa được tạo
+    log_rotator.track(base)
+    _log_paths[key] = (start, start + timedelta(days=1), path)
+    return path
+
+
+def _ensure_log_dir(log_file: str) -> None:
+    if log_file not in _log_dirs_ready:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        _log_dirs_ready.add(log_file)
+
+
+class Lazy:
+    """
+    Tham số trễ cho mlog: Lazy(func, *args, **kwargs) chỉ gọi func(*args, **kwargs) khi dòng log
+    thực sự được ghi. Hàm/method truyền thẳng vào mlog không bị gọi, được in bằng str() như mọi giá trị.
+    """
+
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        return f"Lazy({self.func!r})"
+
+
+def _format_log_args(args, fmt: bool = False) -> List[str]:
+    """
+    Chuyển args của mlog thành list chuỗi, chỉ gọi khi dòng log thực sự được ghi:
+    - Lazy(...) được gọi và lấy kết quả
+    - fmt=True: args[0] % args[1:] kiểu logging ("x=%d", x); format lỗi thì quay về
+      nối các args bằng dấu cách như bình thường
+    """
+    values = [a() if a.__class__ is Lazy else a for a in args]
+    if fmt and len(values) > 1 and isinstance(values[0], str):
+        try:
+            return [values[0] % tuple(values[1:])]
+        except (TypeError, ValueError, KeyError):
+            pass
+    return [str(v) for v in values]
+
+
+# ==================== File search helpers ====================
+
+def _compile_globs(patterns):
+    """Glob hoặc list glob -> (regex cho glob có "/", regex cho glob chỉ theo tên) hoặc None."""
+    if not patterns:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    by_path = [fnmatch.translate(p.replace("\\", "/")) for p in patterns if "/" in p or "\\" in p]
+    by_name = [fnmatch.translate(p) for p in patterns if "/" not in p and "\\" not in p]
+    return (re.compile("|".join(by_path), flags) if by_path else None,
+            re.compile("|".join(by_name), flags) if by_name else None)
+
+
+def _glob_match(globs, rel_path: str, name: str) -> bool:
+    by_path, by_name = globs
+    return bool((by_name is not None and by_name.match(name)) or
+                (by_path is not None and by_path.match(rel_path)))
+
+
+class FileIndex:
+    """
+    Index file trên đĩa (SQLite) cho find_files: mỗi thư mục 1 dòng gồm mtime và danh sách tên
+    file của nó, theo từng root. refresh() chỉ stat() mọi thư mục, và chỉ scandir lại thư mục
+    có mtime đổi (thêm/xóa/đổi tên file bên trong làm đổi mtime của thư mục chứa nó).
+    Mặc định lưu ở ~/.cache/tatools01/file_index.sqlite, dùng chung cho mọi root.
+    """
+
+    # Thư mục vừa đổi trong khoảng này (ns) thì không tin mtime (có thể đổi tiếp trong cùng
+    # "tick" mtime của filesystem): lưu -1 để lần refresh sau quét lại
+    _RACY_NS = 2_000_000_000
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS roots (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, refreshed REAL);
+        CREATE TABLE IF NOT EXISTS dirs (
+            root_id INTEGER NOT NULL, rel TEXT NOT NULL, parent TEXT, mtime_ns INTEGER NOT NULL,
+            n_files INTEGER NOT NULL, names TEXT NOT NULL,
+            PRIMARY KEY (root_id, rel));
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or join(os.path.expanduser("~"), ".cache", "tatools01", "file_index.sqlite")
+        self._local = threading.local()
+
+    def _connect(self) -> "sqlite3.Connection":
+        # Mỗi thread (và mỗi process sau fork) một connection riêng
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self._SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _stat_dir(path: str) -> Optional[int]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns if stat.S_ISDIR(st.st_mode) else None
+
+    @staticmethod
+    def _scan_dir(path: str):
+        """(files, subdirs) của 1 thư mục, None nếu không đọc được. Bỏ qua symlink tới thư mục như os.walk."""
+        files, dirs = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(entry.name)
+                    elif not entry.is_symlink():
+                        dirs.append(entry.name)
+        except OSError:
+            return None
+        return files, dirs
+
+    def refresh(self, directory: str, workers: int = 8) -> dict:
+        """Cập nhật index của directory; trả về thống kê {dirs, scanned, removed, files, seconds}."""
+        t0 = time.perf_counter()
+        root = os.path.abspath(directory)
+        conn = self._connect()
+        pool = ThreadPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+        run = pool.map if pool else map
+        scanned = 0
+        try:
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO roots (path) VALUES (?)", (root,))
+                root_id = conn.execute("SELECT id FROM roots WHERE path = ?", (root,)).fetchone()[0]
+                known = {}
+                children = {}
+                for rel, parent, mtime_ns in conn.execute(
+                        "SELECT rel, parent, mtime_ns FROM dirs WHERE root_id = ?", (root_id,)):
+                    known[rel] = mtime_ns
+                    children.setdefault(parent, []).append(rel)
+                seen = set()
+                level = [""]
+                while level:
+                    # Duyệt theo từng tầng: stat cả tầng (song song), chỉ scandir thư mục có mtime đổi
+                    mtimes = list(run(self._stat_dir, [join(root, rel) for rel in level]))
+                    next_level, to_scan = [], []
+                    for rel, mtime_ns in zip(level, mtimes):
+                        if mtime_ns is None:
+                            continue
+                        seen.add(rel)
+                        if known.get(rel) == mtime_ns:
+                            next_level.extend(children.get(rel, ()))
+                        else:
+                            to_scan.append((rel, mtime_ns))
+                    results = list(run(self._scan_dir, [join(root, rel) for rel, _ in to_scan]))
+                    now_ns = time.time_ns()
+                    for (rel, mtime_ns), result in zip(to_scan, results):
+                        files, subdirs = result if result is not None else ([], [])
+                        if result is None or now_ns - mtime_ns < self._RACY_NS:
+                            mtime_ns = -1
+                        parent = rel.rpartition("/")[0] if rel else None
+                        conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)",
+                                     (root_id, rel, parent, mtime_ns, len(files), "\0".join(files)))
+                        next_level.extend(f"{rel}/{d}" if rel else d for d in subdirs)
+                    scanned += len(to_scan)
+                    level = next_level
+                removed = [rel for rel in known if rel not in seen]
+                conn.executemany("DELETE FROM dirs WHERE root_id = ? AND rel = ?", ((root_id, rel) for rel in removed))
+                conn.execute("UPDATE roots SET refreshed = ? WHERE id = ?", (time.time(), root_id))
+                n_files = conn.execute("SELECT SUM(n_files) FROM dirs WHERE root_id = ?", (root_id,)).fetchone()[0]
+        finally:
+            if pool:
+                pool.shutdown()
+        return {"dirs": len(seen), "scanned": scanned, "removed": len(removed), "files": n_files or 0,
+                "seconds": round(time.perf_counter() - t0, 3)}
+
+    def iter_files(self, directory: str, exts: tuple = (".jpg", ".jpeg", ".png"), include=None, exclude=None,
+                   max_depth: int = None, refresh: bool = True, workers: int = 8):
+        """Như TactParameters.iter_files nhưng đọc từ index (refresh trước nếu refresh=True)."""
+        if refresh:
+            self.refresh(directory, workers)
+        exts = tuple(e.lower() for e in ([exts] if isinstance(exts, str) else exts)) if exts else None
+        include = _compile_globs(include)
+        exclude = _compile_globs(exclude)
+        excluded_dirs = {"": False}  # rel -> thư mục này (hoặc thư mục cha) bị exclude
+
+        def dir_excluded(rel: str) -> bool:
+            hit = excluded_dirs.get(rel)
+            if hit is None:
+                parent, _, name = rel.rpartition("/")
+                hit = excluded_dirs[rel] = dir_excluded(parent) or _glob_match(exclude, rel, name)
+            return hit
+
+        conn = self._connect()
+        row = conn.execute("SELECT id FROM roots WHERE path = ?", (os.path.abspath(directory),)).fetchone()
+        if row is None:
+            return
+        base = join(directory, "").replace("\\", "/")
+        for rel, names in conn.execute("SELECT rel, names FROM dirs WHERE root_id = ? AND n_files > 0", (row[0],)):
+            if max_depth is not None and rel and rel.count("/") + 1 > max_depth:
+                continue
+            if exclude and dir_excluded(rel):
+                continue
+            names = names.split("\0")
+            if exts:
+                names = [n for n in names if n.lower().endswith(exts)]
+            prefix = f"{rel}/" if rel else ""
+            if exclude:
+                names = [n for n in names if not _glob_match(exclude, prefix + n, n)]
+            if include:
+                names = [n for n in names if _glob_match(include, prefix + n, n)]
+            prefix = base + prefix
+            yield from [prefix + n for n in names]
+
+
+file_index = FileIndex()
+
 
 import os # Set từ đầu chương trình luôn
 class TactParameters:
@@ -41,6 +777,26 @@ class TactParameters:
         "saveParam_onlyThis_APP_NAME", "config_file_path", "params_dir", "pp"
     ])
     
+    # Bật để lưu snapshot nhị phân (marshal) cạnh file YAML, dùng thay cho parse YAML
+    # khi file nguồn không đổi. Có thể bật cho từng subclass hoặc toàn cục:
+    #     TactParameters.use_yaml_snapshot = True
+    use_yaml_snapshot = False
+    # Backend đọc YAML: "auto" | "pyyaml" | "ruamel-safe" | "roundtrip" (xem YAML_READ_BACKENDS)
+    yaml_read_backend = "auto"
+    # Bật để from_yaml chỉ đọc + parse section của ModuleName (qua yaml_index)
+    # thay vì cả file; hữu ích khi file chứa rất nhiều module.
+    lazy_yaml_load = False
+    # Bật để mlog chỉ format rồi đẩy vào queue, việc ghi file/in console do log_writer
+    # (background thread) làm theo lô:  TactParameters.async_log = True
+    async_log = False
+    # "text" (mặc định): logs.log dạng "MM/DD, HH:MM:SS [Module] [LEVEL] msg"
+    # "json": logs.jsonl, mỗi dòng 1 object {ts, module, level, lvl, msg, extra}; đọc bằng `tact logs`
+    log_format = "text"
+    # Bật khi nhiều process (multiprocessing pool...) cùng ghi 1 file log: mỗi lần ghi (1 dòng,
+    # hoặc 1 lô khi async_log) giữ file_lock của file log nên các dòng không bị xen giữa nhau.
+    log_multiprocess = False
+    _SNAPSHOT_MAGIC = "tact-yaml-snapshot-1"
+    
     def __init__(
         self, 
         ModuleName: str = "TACT", 
@@ -113,44 +869,174 @@ class TactParameters:
 
     # ==================== Core: Serialize to plain Python types ====================
     
+    _SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+    # Tên attribute public của từng nested class (clsMinio...), tránh gọi dir() mỗi lần
+    _class_attr_names = weakref.WeakKeyDictionary()
+
     def _to_plain_dict(self, obj: Any) -> Any:
         """
         Chuyển đổi object thành plain Python types (dict, list, scalar).
         Đảm bảo YAML có thể serialize được.
+        Duyệt bằng stack (không đệ quy) nên không vướng recursion limit; object dùng chung
+        ở nhiều chỗ chỉ convert 1 lần; vòng tham chiếu được thay bằng "<cycle ...>".
         """
-        if obj is None:
+        container_kind = self._plain_container_kind
+        kind = container_kind(obj)
+        if kind is None:
+            return self._plain_scalar(obj)
+
+        scalar_types = self._SCALAR_TYPES
+        all_scalar = scalar_types.issuperset
+        plain_scalar = self._plain_scalar
+        plain_children = self._plain_children
+        memo = {}        # id(src) -> result đã convert (object dùng chung chỉ convert 1 lần)
+        keep_alive = []  # giữ src sống để id không bị tái sử dụng trong lúc duyệt
+        on_path = set()  # id các container đang duyệt dở (tổ tiên) → gặp lại là vòng
+        root = [] if kind == "list" else {}
+        memo[id(obj)] = root
+        on_path.add(id(obj))
+        stack = [(obj, root, plain_children(obj, kind), kind == "list")]
+        while stack:
+            src, result, children, is_list = stack[-1]
+            for item in children:
+                if is_list:
+                    value = item
+                else:
+                    key, value = item
+                # Fast path: scalar thuần, dict/list lá chỉ chứa scalar thuần
+                value_type = type(value)
+                if value_type in scalar_types:
+                    converted = value
+                elif value_type is dict and all_scalar(map(type, value.values())):
+                    converted = dict(value)
+                elif (value_type is list or value_type is tuple) and all_scalar(map(type, value)):
+                    converted = list(value)
+                else:
+                    child_kind = container_kind(value)
+                    if child_kind is None:
+                        converted = plain_scalar(value)
+                    elif id(value) in memo:
+                        # Đã convert → dùng lại; đang duyệt dở (tổ tiên) → vòng tham chiếu
+                        if id(value) in on_path:
+                            converted = f"<cycle {value_type.__name__}>"
+                        else:
+                            converted = memo[id(value)]
+                    else:
+                        converted = [] if child_kind == "list" else {}
+                        memo[id(value)] = converted
+                        keep_alive.append(value)
+                        on_path.add(id(value))
+                        if is_list:
+                            result.append(converted)
+                        else:
+                            result[key] = converted
+                        stack.append((value, converted, plain_children(value, child_kind),
+                                      child_kind == "list"))
+                        break
+                if is_list:
+                    result.append(converted)
+                else:
+                    result[key] = converted
+            else:
+                on_path.discard(id(src))
+                stack.pop()
+        return root
+
+    @staticmethod
+    def _plain_scalar(obj: Any) -> Any:
+        # Scalar types - trả về nguyên; còn lại (không phải container) → string
+        if type(obj) in TactParameters._SCALAR_TYPES or isinstance(obj, (str, int, float, bool)):
+            return obj
+        return str(obj)
+
+    @staticmethod
+    def _plain_container_kind(obj: Any) -> Optional[str]:
+        """'list' | 'dict' | 'dotdict' | 'object' nếu obj cần duyệt tiếp, None nếu là scalar."""
+        kind = type(obj)
+        if kind in TactParameters._SCALAR_TYPES:
             return None
-        
-        # Scalar types - trả về nguyên
+        if kind is dict:
+            return "dict"
+        if kind is list or kind is tuple:
+            return "list"
         if isinstance(obj, (str, int, float, bool)):
-            return obj
-        
-        # List/tuple
+            return None
         if isinstance(obj, (list, tuple)):
-            return [self._to_plain_dict(item) for item in obj]
-        
-        # Dict thường
+            return "list"
         if isinstance(obj, dict):
-            return {k: self._to_plain_dict(v) for k, v in obj.items()}
-        
-        # DotDict
+            return "dict"
         if isinstance(obj, DotDict):
-            return self._to_plain_dict(obj.to_dict())
-        
+            return "dotdict"
         # Nested class instance (như clsMinio)
         if hasattr(obj, '__dict__') and not isinstance(obj, type):
-            result = {}
-            for key in dir(obj):
-                if key.startswith('_'):
-                    continue
-                value = getattr(obj, key)
-                if callable(value):
-                    continue
-                result[key] = self._to_plain_dict(value)
-            return result
-        
-        # Fallback: convert to string
-        return str(obj)
+            return "object"
+        return None
+
+    @staticmethod
+    def _plain_children(obj: Any, kind: str):
+        """Iterator phần tử (list) hoặc (key, value) (dict/object)."""
+        if kind == "list":
+            return iter(obj)
+        if kind == "dict":
+            return iter(obj.items())
+        if kind == "dotdict":
+            return iter(obj._data.items())
+        return TactParameters._object_children(obj)
+
+    @staticmethod
+    def _object_children(obj: Any):
+        """Attribute public, không callable của nested class instance, theo thứ tự dir()."""
+        cls = type(obj)
+        class_names = TactParameters._class_attr_names.get(cls)
+        if class_names is None:
+            class_names = frozenset(k for k in dir(cls) if not k.startswith('_'))
+            TactParameters._class_attr_names[cls] = class_names
+        names = class_names.union(k for k in obj.__dict__ if not k.startswith('_'))
+        for key in sorted(names):
+            value = getattr(obj, key)
+            if callable(value):
+                continue
+            yield key, value
+
+    @staticmethod
+    def _plain_equal(a: Any, b: Any) -> bool:
+        """
+        So sánh cấu trúc 2 giá trị plain (dict/list/scalar).
+        Khác với ==, phân biệt cả kiểu: True != 1, 1 != 1.0
+        (nhưng ScalarFloat/ScalarInt của ruamel được coi như float/int;
+        tuple của default được coi như list, vì YAML luôn đọc ra list).
+        """
+        if type(a) is not type(b) and TactParameters._plain_kind(a) is not TactParameters._plain_kind(b):
+            return False
+        if isinstance(a, dict):
+            if len(a) != len(b):
+                return False
+            pairs = ((v, b.get(k, _MISSING)) for k, v in a.items())
+        elif isinstance(a, (list, tuple)):
+            if len(a) != len(b):
+                return False
+            pairs = zip(a, b)
+        else:
+            return a == b
+        scalar_types = TactParameters._SCALAR_TYPES
+        for x, y in pairs:
+            tx = type(x)
+            if tx is type(y) and tx in scalar_types:
+                # Fast path: scalar cùng kiểu
+                if x != y:
+                    return False
+            elif y is _MISSING or not TactParameters._plain_equal(x, y):
+                return False
+        return True
+
+    @staticmethod
+    def _plain_kind(obj: Any) -> type:
+        for kind in (bool, int, float, str, dict, list):
+            if isinstance(obj, kind):
+                return kind
+        if isinstance(obj, tuple):
+            return list
+        return type(obj)
 
     # ==================== Core: Check if nested class ====================
     
@@ -166,73 +1052,132 @@ class TactParameters:
 
     # ==================== Core: Deep Merge ====================
     
-    def _deep_merge(self, default: Any, from_file: Any) -> Any:
+    def _deep_merge(self, default: Any, from_file: Any, changed_paths: set = None, path: tuple = ()) -> Any:
         """
         Deep merge: from_file ưu tiên, default bổ sung key thiếu.
         Giữ nguyên TYPE của default.
+        Structural sharing: nhánh nào file không đổi thì dùng lại nguyên object của default,
+        chỉ copy các dict/DotDict nằm trên đường đi tới giá trị bị override.
+        changed_paths (nếu truyền vào) nhận các key path (tuple) mà file override default.
         """
         # from_file là dict
         if isinstance(from_file, dict):
-            # Lấy default dưới dạng dict
             if isinstance(default, dict):
-                base = dict(default)  # Copy
-                convert_to_dotdict = False
-            elif isinstance(default, DotDict):
-                base = default.to_dict()
-                convert_to_dotdict = True
-            elif self._is_nested_class(default):
+                return self._merge_mapping(default, from_file, changed_paths, path)
+            if isinstance(default, DotDict):
+                return self._merge_dotdict(default, from_file, changed_paths, path)
+            if self._is_nested_class(default):
+                # Nested class → DotDict (truy cập bằng dot như cũ)
                 base = self._to_plain_dict(default)
-                convert_to_dotdict = True
-            else:
-                base = {}
-                convert_to_dotdict = False
-            
-            # Merge từng key
-            for k, v in from_file.items():
-                base[k] = self._deep_merge(base.get(k), v)
-            
-            # Trả về đúng type
-            if convert_to_dotdict:
-                return DotDict(base)
-            else:
-                return base
+                return DotDict._wrap(self._merge_mapping(base, from_file, changed_paths, path))
+            # Default không phải dict → lấy nguyên giá trị file (dữ liệu file đã là bản riêng)
+            if changed_paths is not None:
+                changed_paths.add(path)
+            return from_file
         
-        # from_file là list
-        elif isinstance(from_file, (list, tuple)):
+        # from_file là list/scalar: giống default thì giữ default, không cấp phát gì
+        # (default là tuple: không tính là override, nhưng trả về list như giá trị đọc từ file)
+        if self._plain_equal(default, from_file):
+            return list(from_file) if type(default) is tuple else default
+        if changed_paths is not None:
+            changed_paths.add(path)
+        if isinstance(from_file, tuple):
             return list(from_file)
-        
-        # from_file là scalar
-        else:
-            return from_file
+        return from_file
+
+    def _merge_mapping(self, default: dict, from_file: dict, changed_paths: set, path: tuple) -> dict:
+        """Merge vào dict; chỉ copy default (nông) khi có key thực sự thay đổi."""
+        scalar_types = self._SCALAR_TYPES
+        track = changed_paths is not None
+        result = None
+        for k, v in from_file.items():
+            old = default.get(k, _MISSING)
+            if old is _MISSING:
+                if changed_paths is not None:
+                    changed_paths.add(path + (k,))
+                new = v
+            elif type(v) is type(old) and type(v) in scalar_types and v == old:
+                continue  # Fast path: scalar giống hệt default
+            else:
+                new = self._deep_merge(old, v, changed_paths, path + (k,) if track else path)
+                if new is old:
+                    continue
+            if result is None:
+                result = dict(default)
+            result[k] = new
+        return default if result is None else result
+
+    def _merge_dotdict(self, default: "DotDict", from_file: dict, changed_paths: set, path: tuple) -> "DotDict":
+        """Như _merge_mapping cho DotDict (bên trong DotDict là cây dict thường)."""
+        current = default._data
+        merged = self._merge_mapping(current, from_file, changed_paths, path)
+        return default if merged is current else DotDict._wrap(merged)
 
     # ==================== YAML Operations ====================
     
-    def to_yaml(self, file_path: str) -> None:
-        """Lưu parameters của module hiện tại vào file YAML."""
+    def to_yaml(self, file_path: str) -> bool:
+        """
+        Lưu parameters của module hiện tại vào file YAML.
+        Trả về False nếu nội dung module trên file đã giống hệt (không ghi file).
+        Read-modify-write được giữ trong file_lock nên an toàn khi nhiều process cùng ghi.
+        """
         file_path = self._get_full_file_path(file_path)
         
-        # Đọc file hiện tại
-        existing_content = self._read_yaml_safe(file_path)
-        
         # Chuyển params thành plain dict
         params = self._get_params()
         plain_params = self._to_plain_dict(params)
         
-        # Cập nhật module
-        existing_content[self.ModuleName] = plain_params
+        # Lazy mode: so sánh với riêng section của module, không cần parse cả file
+        if self.lazy_yaml_load and not self._in_batch(file_path):
+            section = self._read_module_section(file_path)
+            if section is not None and self._module_unchanged(section, plain_params):
+                return False
+        
+        # So sánh trước, không lock: với yaml_cache chỉ tốn 1 stat + cache hit.
+        # Không đổi → không lấy lock (không tạo file .lock, không chờ process khác)
+        existing_content = self._read_yaml_safe(file_path, readonly=True)
+        unchanged = self._module_unchanged(existing_content, plain_params)
         
-        # Ghi file
-        self._write_yaml(file_path, existing_content)
+        # Đang trong batch_save → chỉ ghi nhận, flush một lần khi thoát batch
+        # (báo có thay đổi hay không theo file hiện tại, ghi thật khi flush)
+        if self._queue_batched_save(file_path, plain_params):
+            return not unchanged
+        if unchanged:
+            return False
+        
+        with file_lock(file_path):
+            # Đọc lại trong lock: process khác có thể vừa ghi
+            existing_content = self._read_yaml_safe(file_path)
+            
+            # Không có gì thay đổi → không ghi, tránh đổi mtime của file
+            if self._module_unchanged(existing_content, plain_params):
+                return False
+            
+            # Cập nhật module
+            existing_content[self.ModuleName] = plain_params
+            
+            # Ghi file
+            self._write_yaml(file_path, existing_content)
+        return True
+
+    def _module_unchanged(self, existing_content: dict, plain_params: dict) -> bool:
+        return self.ModuleName in existing_content and self._plain_equal(
+            existing_content[self.ModuleName], plain_params
+        )
 
-    def from_yaml(self, file_path: str) -> None:
+    def from_yaml(self, file_path: str) -> set:
         """
         Đọc parameters từ file YAML và merge với default.
         - File có key → dùng giá trị file
         - File không có key → giữ default
+        Trả về tập key path (tuple) mà file override default, vd {("Minio", "IP")}.
         """
         file_path = self._get_full_file_path(file_path)
-        data = self._read_yaml_safe(file_path)
+        data = self._read_module_section(file_path) if self.lazy_yaml_load else None
+        if data is None:
+            data = self._read_yaml_safe(file_path)
         
+        overridden = set()
         if self.ModuleName in data:
             file_data = data[self.ModuleName]
             
@@ -241,8 +1186,9 @@ class TactParameters:
                     continue
                 
                 default_value = getattr(self, key, None)
-                merged = self._deep_merge(default_value, file_value)
+                merged = self._deep_merge(default_value, file_value, overridden, (key,))
                 setattr(self, key, merged)
+        return overridden
 
     def load_then_save_to_yaml(
         self, 
@@ -250,48 +1196,289 @@ class TactParameters:
         ModuleName: str = None, 
         flogDict: bool = False, 
         save2file: bool = True
-    ) -> None:
+    ) -> bool:
         """
         Load params từ file (merge với default), sau đó save lại.
+        Trả về True nếu file đã được ghi (False nếu không đổi hoặc save2file=False).
         """
         if ModuleName:
             self.ModuleName = ModuleName
         self.fn = file_path
         self.from_yaml(file_path)
+        written = False
         if save2file:
-            self.to_yaml(file_path)
+            written = self.to_yaml(file_path)
         if flogDict:
             self._log(str(self.__dict__))
+        return written
 
-    def save_to_yaml_only(self, filepath: str = None) -> None:
+    def save_to_yaml_only(self, filepath: str = None) -> bool:
         """Chỉ save, không load."""
-        self.to_yaml(filepath or self.fn)
+        return self.to_yaml(filepath or self.fn)
+
+    # ==================== Batch Save ====================
+
+    @staticmethod
+    @contextmanager
+    def batch_save(file_path: str):
+        """
+        Gom các lần to_yaml() vào cùng file thành 1 lần đọc + 1 lần ghi.
+
+            with TactParameters.batch_save("My_Project_Name.yml"):
+                p1 = Params_01()
+                p2 = Params_02()
+            # File được ghi đúng 1 lần ở đây
+
+        file_path phải trùng với đường dẫn thực tế mà các module ghi vào
+        (tức là join(params_dir, basename(file)) nếu có dùng AppName + params_dir).
+        Batch lồng nhau trên cùng file được gộp vào batch ngoài cùng.
+        """
+        key = os.path.abspath(file_path)
+        with _batch_lock:
+            if key in _active_batches:
+                outermost = False
+            else:
+                _active_batches[key] = {"owner": None, "modules": {}}
+                outermost = True
+        if not outermost:
+            yield
+            return
+        try:
+            yield
+        finally:
+            with _batch_lock:
+                batch = _active_batches.pop(key)
+            if batch["modules"]:
+                batch["owner"]._flush_batch(key, batch["modules"])
+
+    @staticmethod
+    def _in_batch(file_path: str) -> bool:
+        with _batch_lock:
+            return os.path.abspath(file_path) in _active_batches
+
+    def _queue_batched_save(self, file_path: str, plain_params: dict) -> bool:
+        """Ghi nhận params vào batch đang mở của file (nếu có)."""
+        key = os.path.abspath(file_path)
+        with _batch_lock:
+            batch = _active_batches.get(key)
+            if batch is None:
+                return False
+            if batch["owner"] is None:
+                batch["owner"] = self
+            batch["modules"][self.ModuleName] = plain_params
+            return True
+
+    def _flush_batch(self, file_path: str, modules: dict) -> bool:
+        """Một lần read-modify-write cho tất cả module đã gom; bỏ qua nếu không module nào đổi."""
+        with file_lock(file_path):
+            existing_content = self._read_yaml_safe(file_path)
+            changed = {
+                name: params for name, params in modules.items()
+                if not (name in existing_content and self._plain_equal(existing_content[name], params))
+            }
+            if not changed:
+                return False
+            existing_content.update(changed)
+            self._write_yaml(file_path, existing_content)
+        return True
+
+    # ==================== Hot Reload ====================
+
+    def watch(self, callback: Callable = None, file_path: str = None) -> None:
+        """
+        Bật hot-reload: khi section ModuleName trong file YAML thay đổi, params được
+        merge lại (cùng ngữ nghĩa _deep_merge như from_yaml) và callback(self, changed_keys)
+        được gọi. Mặc định dùng file của load_then_save_to_yaml (self.fn).
+        """
+        path = self._get_full_file_path(file_path or self.fn)
+        if not path:
+            raise ValueError("watch(): chưa có file_path (gọi load_then_save_to_yaml trước)")
+        params_watcher.add(self, path, callback)
+
+    def unwatch(self) -> None:
+        """Tắt hot-reload cho instance này."""
+        params_watcher.remove(self)
+
+    def _apply_section(self, file_data: dict) -> set:
+        """
+        Merge section mới từ file vào instance, trả về tập key đã thay đổi.
+        Toàn bộ giá trị mới được tính trước rồi cập nhật __dict__ một lần.
+        """
+        updates = {}
+        for key, file_value in file_data.items():
+            if key in self._INTERNAL_KEYS:
+                continue
+            changed_paths = set()
+            merged = self._deep_merge(getattr(self, key, None), file_value, changed_paths, (key,))
+            if changed_paths:
+                updates[key] = merged
+        self.__dict__.update(updates)
+        return set(updates)
 
     # ==================== File Operations ====================
     
-    def _read_yaml_safe(self, file_path: str) -> dict:
-        """Đọc YAML file an toàn, trả về {} nếu lỗi."""
+    def _read_yaml_safe(self, file_path: str, readonly: bool = False) -> dict:
+        """
+        Đọc YAML file an toàn (qua yaml_cache), trả về {} nếu lỗi.
+        readonly=True: không copy từ cache, chỉ dùng để so sánh (không được sửa kết quả).
+        """
         if not exists(file_path):
             return {}
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = yaml.load(f)
-                # Convert ruamel types to plain Python
-                return self._to_plain_dict(content) if content else {}
+            return yaml_cache.load(file_path, self._parse_yaml_file, readonly)
         except FileNotFoundError:
             return {}
         except Exception as e:
             # Dùng print vì mlog có thể chưa sẵn sàng hoặc gây lặp vô tận nếu lỗi log
             print(f"Warning: Cannot read YAML {file_path}: {e}")
             return {}
+
+    def _read_module_section(self, file_path: str) -> Optional[dict]:
+        """
+        Lazy mode: {ModuleName: section} hoặc {} nếu file không có module,
+        None nếu cần parse cả file (file chưa có, index không dùng được...).
+        """
+        if not exists(file_path):
+            return {}
+        try:
+            return yaml_index.section(file_path, self.ModuleName, self._parse_yaml_text)
+        except Exception as e:
+            print(f"Warning: Cannot index YAML {file_path}: {e}")
+            return None
+
+    def _parse_yaml_file(self, file_path: str) -> dict:
+        """Parse YAML file thành plain dict (không qua cache), dùng snapshot nếu được bật."""
+        if self.use_yaml_snapshot:
+            data = self._load_snapshot(file_path)
+            if data is not None:
+                return data
+        st = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        data = self._parse_yaml_text(raw.decode("utf-8"))
+        if self.use_yaml_snapshot:
+            self._save_snapshot(file_path, data, raw, st)
+        return data
+
+    def _parse_yaml_text(self, text: str) -> dict:
+        """Parse chuỗi YAML bằng backend đọc đã chọn, fallback round-trip."""
+        backend, load = get_yaml_read_backend(self.yaml_read_backend)
+        try:
+            content = load(text)
+        except Exception:
+            if backend == "roundtrip":
+                raise
+            # Backend nhanh không đọc được (tag lạ...) → fallback về round-trip
+            content = _load_roundtrip(text)
+        # Convert ruamel types to plain Python
+        if not content:
+            return {}
+        data = self._to_plain_dict(content)
+        # Alias chỉ có khi text có '*': file thường không tốn thêm lần duyệt nào
+        return _unalias(data) if "*" in text else data
     
     def _write_yaml(self, file_path: str, content: dict) -> None:
-        """Ghi content vào YAML file."""
+        """
+        Ghi content vào YAML file một cách atomic: ghi ra file tạm cùng thư mục,
+        fsync rồi os.replace → process khác không bao giờ thấy file ghi dở.
+        """
+        # Dump trước khi tạo file tạm: dump lỗi thì không có fd/file tạm nào phải dọn
+        buf = io.StringIO()
+        yaml.dump(content, buf)
+        raw = buf.getvalue().encode("utf-8")
+
         dir_path = os.path.dirname(file_path)
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            yaml.dump(content, f)
+        # Tạo bằng os.open(0o666) thay vì mkstemp (0o600): file mới có quyền theo umask
+        # như open(file, "w") trước đây; file cũ thì giữ nguyên quyền của nó
+        tmp_path = join(dir_path or ".", f".{basename(file_path)}.{os.urandom(6).hex()}.tmp")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+            with os.fdopen(fd, "wb") as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            mode = self._existing_file_mode(file_path)
+            if mode is not None:
+                os.chmod(tmp_path, mode)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            yaml_cache.invalidate(file_path)
+            if exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        yaml_cache.put(file_path, content)
+        yaml_index.invalidate(file_path)
+        if self.use_yaml_snapshot:
+            self._save_snapshot(file_path, content, raw, os.stat(file_path))
+
+    @staticmethod
+    def _existing_file_mode(file_path: str) -> Optional[int]:
+        """Quyền của file cũ, None nếu file chưa tồn tại."""
+        try:
+            return stat.S_IMODE(os.stat(file_path).st_mode)
+        except OSError:
+            return None
+
+    # ==================== Binary Snapshot ====================
+
+    @staticmethod
+    def _snapshot_path(file_path: str) -> str:
+        return join(os.path.dirname(file_path), f".{basename(file_path)}.snapshot")
+
+    def _load_snapshot(self, file_path: str) -> Optional[dict]:
+        """
+        Đọc snapshot nếu còn hợp lệ, ngược lại trả về None.
+        Hợp lệ khi (mtime_ns, size) khớp; nếu mtime khác nhưng size khớp thì so hash nội dung.
+        """
+        try:
+            with open(self._snapshot_path(file_path), "rb") as f:
+                magic, py_ver, mtime_ns, size, digest, data = marshal.load(f)
+            if magic != self._SNAPSHOT_MAGIC or py_ver != sys.version_info[:2]:
+                return None
+            st = os.stat(file_path)
+            if st.st_size != size:
+                return None
+            if st.st_mtime_ns == mtime_ns:
+                return data
+            with open(file_path, "rb") as f:
+                if hashlib.blake2b(f.read(), digest_size=16).digest() == digest:
+                    return data
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        return None
+
+    def _save_snapshot(self, file_path: str, data: dict, raw: bytes, st: os.stat_result) -> None:
+        """Ghi snapshot (atomic) cho nội dung raw đã parse ra data. Lỗi chỉ cảnh báo."""
+        snap_path = self._snapshot_path(file_path)
+        header = (
+            self._SNAPSHOT_MAGIC, sys.version_info[:2], st.st_mtime_ns, len(raw),
+            hashlib.blake2b(raw, digest_size=16).digest(), self._to_builtin(data),
+        )
+        tmp_path = f"{snap_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                marshal.dump(header, f)
+            os.replace(tmp_path, snap_path)
+        except Exception as e:
+            print(f"Warning: Cannot write YAML snapshot {snap_path}: {e}")
+            if exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _to_builtin(obj: Any) -> Any:
+        """Đổi ScalarFloat/ScalarInt... của ruamel về float/int thuần để marshal được."""
+        if isinstance(obj, dict):
+            return {TactParameters._to_builtin(k): TactParameters._to_builtin(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [TactParameters._to_builtin(v) for v in obj]
+        if obj is None or type(obj) in (bool, int, float, str):
+            return obj
+        for kind in (bool, int, float, str):
+            if isinstance(obj, kind):
+                return kind(obj)
+        return str(obj)
 
     def _get_full_file_path(self, file_path: str) -> str:
         if self.AppName and self.params_dir:
@@ -308,12 +1495,137 @@ class TactParameters:
         return getattr(self, key, default)
 
     @staticmethod
-    def find_files(directory: str, exts: tuple = (".jpg", ".jpeg", ".png")) -> List[str]:
-        return sorted(
-            join(root, f).replace("\\", "/")
-            for root, _, files in os.walk(directory)
-            for f in files if f.lower().endswith(exts)
-        )
+    def find_files(directory: str, exts: tuple = (".jpg", ".jpeg", ".png"), sort: bool = True,
+                   include=None, exclude=None, max_depth: int = None, workers: int = 8,
+                   index=None) -> List[str]:
+        """
+        List file trong directory có đuôi thuộc exts (exts=None: mọi file), mặc định sắp xếp.
+        sort=False bỏ bước sort (nhanh hơn, thứ tự tùy lúc quét). Các tham số khác: xem iter_files.
+        index: True (dùng file_index), đường dẫn file .sqlite, hoặc 1 FileIndex -> chỉ quét lại
+        thư mục có mtime đổi so với lần trước thay vì quét cả cây.
+        """
+        if index:
+            if index is True:
+                index = file_index
+            elif isinstance(index, str):
+                index = FileIndex(index)
+            files = index.iter_files(directory, exts, include=include, exclude=exclude,
+                                     max_depth=max_depth, workers=workers)
+        else:
+            files = TactParameters.iter_files(directory, exts, include=include, exclude=exclude,
+                                              max_depth=max_depth, workers=workers)
+        return sorted(files) if sort else list(files)
+
+    @staticmethod
+    def iter_files(directory: str, exts: tuple = (".jpg", ".jpeg", ".png"), include=None, exclude=None,
+                   max_depth: int = None, workers: int = 8):
+        """
+        Generator: yield đường dẫn file ngay khi quét tới (không thứ tự, không giữ cả list).
+        - Quét song song bằng os.scandir trên `workers` thread (workers=1: quét tuần tự)
+        - include / exclude: glob (hoặc list glob) kiểu fnmatch; glob có "/" so với đường dẫn
+          tương đối từ directory, không có "/" so với tên file/thư mục. exclude áp cho cả thư mục
+          (bỏ qua cả nhánh), include chỉ áp cho file.
+        - max_depth: 0 = chỉ file nằm ngay trong directory, 1 = thêm 1 cấp thư mục con...
+        Giống os.walk: không đi vào symlink tới thư mục, bỏ qua thư mục không đọc được.
+        """
+        exts = tuple(e.lower() for e in ([exts] if isinstance(exts, str) else exts)) if exts else None
+        include = _compile_globs(include)
+        exclude = _compile_globs(exclude)
+
+        def scan(path: str, rel: str, depth: int):
+            files, dirs = [], []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        name = entry.name
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            if entry.is_symlink() or (max_depth is not None and depth >= max_depth):
+                                continue
+                            if exclude and _glob_match(exclude, rel + name, name):
+                                continue
+                            dirs.append((entry.path, rel + name + "/", depth + 1))
+                            continue
+                        if exts and not name.lower().endswith(exts):
+                            continue
+                        if exclude and _glob_match(exclude, rel + name, name):
+                            continue
+                        if include and not _glob_match(include, rel + name, name):
+                            continue
+                        files.append(entry.path.replace("\\", "/"))
+            except OSError:
+                pass
+            return files, dirs
+
+        if workers is None or workers <= 1:
+            stack = [(directory, "", 0)]
+            while stack:
+                files, dirs = scan(*stack.pop())
+                yield from files
+                stack.extend(reversed(dirs))
+            return
+
+        # Worker tự lấy thư mục từ `work`, đẩy thư mục con ngược lại `work` và file vào `results`;
+        # main thread chỉ yield. `outstanding` = số thư mục đã đưa vào `work` mà chưa quét xong.
+        # `results` có giới hạn: consumer chậm thì worker dừng chờ, không liệt kê cả cây vào RAM.
+        work = queue.SimpleQueue()
+        results = queue.Queue(maxsize=workers * 4)
+        stop = threading.Event()
+        counter_lock = threading.Lock()
+        outstanding = [1]
+
+        def put(item) -> None:
+            # Chờ chỗ trống trong results, nhưng thoát ngay khi generator đã dừng (stop)
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def worker():
+            while True:
+                item = work.get()
+                if item is None or stop.is_set():
+                    return
+                dirs = ()
+                try:
+                    files, dirs = scan(*item)
+                    for d in dirs:
+                        work.put(d)
+                    if files:
+                        put(files)
+                except BaseException as e:
+                    # Lỗi ngoài OSError (filter, glob...): chuyển cho generator raise lại
+                    put(e)
+                finally:
+                    # Luôn trừ outstanding, không thì generator chờ results.get() mãi
+                    with counter_lock:
+                        outstanding[0] += len(dirs) - 1
+                        finished = outstanding[0] == 0
+                    if finished:
+                        put(None)
+
+        threads = [threading.Thread(target=worker, name="find_files", daemon=True) for _ in range(workers)]
+        work.put((directory, "", 0))
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                files = results.get()
+                if files is None:
+                    break
+                if isinstance(files, BaseException):
+                    raise files
+                yield from files
+        finally:
+            # Xong, lỗi, hoặc generator bị dừng giữa chừng (break): cho các worker thoát
+            stop.set()
+            for _ in threads:
+                work.put(None)
 
     # ==================== Logging ====================
     
@@ -334,7 +1646,7 @@ class TactParameters:
     #     with open(log_file, "a", encoding="utf-8") as f:
     #         f.write(log_line + "\n")
     #     print(log_line)
-    def mlog(self, *args, level: str | int | None = None, **kwargs) -> None:
+    def mlog(self, *args, level: str | int | None = None, fmt: bool = False, **kwargs) -> None:
         """
         Logger linh hoạt hỗ trợ level string hoặc int.
         
@@ -343,28 +1655,27 @@ class TactParameters:
             1 hoặc 'info'             -> INFO
             2 hoặc 'debug'            -> DEBUG
             3 hoặc 'trace'            -> TRACE
+
+        Format trễ (chỉ tốn công khi dòng log thực sự được ghi):
+            self.mlog("fps=%.1f cam=%s", fps, cam_id, level="trace", fmt=True)  # %-style như logging
+            self.mlog(Lazy(expensive_summary, frame), level="debug")              # chỉ gọi khi ghi
+        Trong vòng lặp nóng có thể kiểm tra trước: if self.is_enabled("trace"): ...
         """
-        # Mapping level string sang int
-        level_map = {
-            'critical': 0, 'error': 0,
-            'warning': 1, 'info': 1,
-            'debug': 2,
-            'trace': 3
-        }
-        
-        # Determine numeric level
-        numeric_level = 2 # Default DEBUG
-        if isinstance(level, int):
+        # Early return check: level -> số qua bảng tính sẵn, so với ngưỡng DEBUG_MODE của instance
+        if level is None:
+            numeric_level = 2  # Default DEBUG
+        elif level.__class__ is int:
             numeric_level = level
-        elif isinstance(level, str):
-            numeric_level = level_map.get(level.lower(), 2)
-        
-        # Early return check
+        else:
+            # Chỉ str mới tra bảng trực tiếp; giá trị khác (kể cả không hash được) qua _resolve_log_level
+            numeric_level = _LOG_LEVELS.get(level) if level.__class__ is str else None
+            if numeric_level is None:
+                numeric_level = _resolve_log_level(level)
         if self.DEBUG_MODE < numeric_level:
             return
 
         # Xây dựng nội dung log
-        log_parts = [str(arg) for arg in args]
+        log_parts = _format_log_args(args, fmt)
         
         # Xử lý trường hợp đặc biệt: user truyền args=[] hoặc kwargs={} như một keyword param (như trong test)
         if 'args' in kwargs and isinstance(kwargs['args'], (list, tuple)):
@@ -374,33 +1685,633 @@ class TactParameters:
             inner_kwargs = kwargs.pop('kwargs')
             log_parts.append(f"kwargs={inner_kwargs}")
 
-        # Thêm các keyword arguments còn lại nếu có
-        if kwargs:
+        # Thêm các keyword arguments còn lại nếu có (chế độ json: nằm trong field "extra")
+        json_mode = self.log_format == "json"
+        if kwargs and not json_mode:
             log_parts.append(f"extra={kwargs}")
 
         message = " ".join(log_parts)
         now = datetime.now()
         timestamp = now.strftime("%m/%d, %H:%M:%S")
 
-        # Xác định file log
-        log_file = self.getLogfilename()
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        # Xác định file log (cache theo ngày, không tính lại mỗi dòng)
+        log_file = self.getLogfilename(now)
+
+        level_name = str(level or numeric_level).upper()
+        log_line = f"{timestamp} [{self.ModuleName}] [{level_name}] {message}"
+        file_line = log_line
+        if json_mode:
+            record = {"ts": now.isoformat(timespec="microseconds"), "module": self.ModuleName,
+                      "level": level_name, "lvl": numeric_level, "msg": message}
+            if kwargs:
+                record["extra"] = kwargs
+            file_line = json.dumps(record, ensure_ascii=False, default=str)
 
-        log_line = f"{timestamp} [{self.ModuleName}] [{str(level or numeric_level).upper()}] {message}"
+        if self.async_log:
+            log_writer.submit(log_file, file_line, log_line, lock=self.log_multiprocess)
+            return
 
         try:
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(log_line + "\n")
+            _ensure_log_dir(log_file)
+            try:
+                f = open(log_file, "a", encoding="utf-8")
+            except FileNotFoundError:
+                # Thư mục bị xóa giữa ngày (dọn log...) -> tạo lại rồi thử lần nữa
+                _log_dirs_ready.discard(log_file)
+                _ensure_log_dir(log_file)
+                f = open(log_file, "a", encoding="utf-8")
+            with f:
+                if self.log_multiprocess:
+                    with file_lock(log_file):
+                        f.write(file_line + "\n")
+                        f.flush()
+                else:
+                    f.write(file_line + "\n")
+                size = f.tell() if log_rotator.max_bytes else 0
+            if size and size >= log_rotator.max_bytes:
+                log_rotator.rotate(log_file)
         except Exception as e:
             print(f"Logging Error: {e}")
 
         print(log_line)
 
-    def getLogfilename(self) -> str:
-        """Trả về đường dẫn file log dựa trên ngày hiện tại."""
-        now = datetime.now()
-        base = self.logdir or "."
-        return join(base, "logs", str(now.year), str(now.month), str(now.day), "logs.log").replace("\\", "/")
+    def is_enabled(self, level: str | int | None = None) -> bool:
+        """True nếu mlog(level=level) sẽ được ghi với DEBUG_MODE hiện tại."""
+        if level is None:
+            return self.DEBUG_MODE >= 2
+        if level.__class__ is int:
+            return self.DEBUG_MODE >= level
+        numeric_level = _LOG_LEVELS.get(level) if level.__class__ is str else None
+        if numeric_level is None:
+            numeric_level = _resolve_log_level(level)
+        return self.DEBUG_MODE >= numeric_level
+
+    def getLogfilename(self, now: datetime = None) -> str:
+        """Trả về đường dẫn file log dựa trên ngày hiện tại (hoặc ngày của `now`)."""
+        name = "logs.jsonl" if self.log_format == "json" else "logs.log"
+        return _daily_log_path(self.logdir or ".", now or datetime.now(), name)
+
+class ParamsWatcher:
+    """
+    Theo dõi file YAML bằng polling stat() trong 1 background thread dùng chung.
+    Mỗi vòng chỉ stat mỗi file 1 lần (dù có bao nhiêu module cùng file); chỉ parse
+    lại khi chữ ký file đổi, và chỉ reload module có section thực sự thay đổi.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()  # check_now() từ thread và từ user không chạy chồng
+        self._files = {}  # abspath -> {"sig": tuple|None, "subs": [subscription]}
+        self._thread = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _signature(file_path: str):
+        try:
+            return YamlCache._signature(file_path)
+        except OSError:
+            return None
+
+    def add(self, params: "TactParameters", file_path: str, callback: Callable = None) -> None:
+        key = os.path.abspath(file_path)
+        section = params._read_yaml_safe(key).get(params.ModuleName)
+        with self._lock:
+            for entry in self._files.values():
+                for sub in entry["subs"]:
+                    if sub["ref"]() is params:
+                        if callback is not None:
+                            sub["callbacks"].append(callback)
+                        return
+            entry = self._files.setdefault(key, {"sig": self._signature(key), "subs": []})
+            entry["subs"].append({
+                "ref": weakref.ref(params),
+                "callbacks": [callback] if callback is not None else [],
+                "section": section,
+            })
+            self._stop.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ParamsWatcher", daemon=True)
+                self._thread.start()
+
+    def remove(self, params: "TactParameters") -> None:
+        with self._lock:
+            for key in list(self._files):
+                subs = self._files[key]["subs"]
+                subs[:] = [s for s in subs if s["ref"]() not in (None, params)]
+                if not subs:
+                    del self._files[key]
+
+    def stop(self) -> None:
+        """Dừng thread và bỏ toàn bộ đăng ký."""
+        with self._lock:
+            self._files.clear()
+            self._stop.set()
+
+    def check_now(self) -> None:
+        """Kiểm tra ngay tất cả file (thread gọi định kỳ; cũng dùng được để test)."""
+        with self._check_lock:
+            with self._lock:
+                changed_files = []
+                for key, entry in self._files.items():
+                    sig = self._signature(key)
+                    if sig != entry["sig"]:
+                        entry["sig"] = sig
+                        changed_files.append((key, list(entry["subs"])))
+            for key, subs in changed_files:
+                self._reload_file(key, subs)
+
+    def _reload_file(self, file_path: str, subs: list) -> None:
+        data = None
+        for sub in subs:
+            params = sub["ref"]()
+            if params is None:
+                continue
+            if data is None:
+                data = params._read_yaml_safe(file_path)
+            section = data.get(params.ModuleName)
+            if section is None or TactParameters._plain_equal(section, sub["section"]):
+                continue
+            sub["section"] = section
+            changed = params._apply_section(copy.deepcopy(section))
+            if not changed:
+                continue
+            for callback in list(sub["callbacks"]):
+                try:
+                    callback(params, changed)
+                except Exception as e:
+                    params.mlog(f"Hot-reload callback error: {e}", level="error")
+
+    def _run(self) -> None:
+        while True:
+            self._stop.wait(self.interval)
+            with self._lock:
+                # Bỏ các instance đã bị garbage-collect; hết file cần theo dõi thì dừng thread
+                for key in list(self._files):
+                    subs = self._files[key]["subs"]
+                    subs[:] = [s for s in subs if s["ref"]() is not None]
+                    if not subs:
+                        del self._files[key]
+                if not self._files:
+                    self._thread = None
+                    return
+            try:
+                self.check_now()
+            except Exception as e:
+                print(f"Warning: ParamsWatcher error: {e}")
+
+
+params_watcher = ParamsWatcher()
+
+
+class AsyncLogWriter:
+    """
+    Ghi log bất đồng bộ cho mlog (khi TactParameters.async_log = True).
+    mlog chỉ đẩy (file, dòng) vào queue; 1 background thread gom theo lô, giữ file handle
+    mở sẵn, ghi khi buffer vượt flush_bytes hoặc sau flush_interval giây, và flush lần cuối
+    lúc thoát chương trình (atexit). Sang ngày mới thì đóng toàn bộ handle của ngày cũ.
+    """
+
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, flush_interval: float = 0.5, flush_bytes: int = 64 << 10, echo: bool = True):
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.echo = echo  # in dòng log ra console (theo lô, từ writer thread)
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._handles = {}  # path -> file object (append, đang mở)
+        self._locked_paths = set()  # file log cần ghi trong file_lock (log_multiprocess)
+        self._day = None
+        self._atexit_registered = False
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def submit(self, log_file: str, line: str, echo_line: str = None, lock: bool = False) -> None:
+        """
+        Đẩy 1 dòng vào queue; echo_line là dòng in ra console nếu khác dòng ghi file.
+        lock=True: các lô ghi vào log_file được ghi trong file_lock (nhiều process chung file).
+        """
+        if lock and log_file not in self._locked_paths:
+            self._locked_paths.add(log_file)
+        if self._thread is None:
+            self._start()
+        self._queue.put((log_file, line, echo_line))
+
+    def flush(self, timeout: float = None) -> bool:
+        """Chờ đến khi mọi dòng đã submit trước lời gọi này được ghi xuống file."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put((self._FLUSH, done, None))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Ghi nốt queue, đóng file và dừng thread (tự gọi lúc thoát chương trình)."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put((self._STOP, None, None))
+        thread.join(timeout)
+        with self._lock:
+            if self._thread is thread:
+                self._thread = None
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+            self._thread = threading.Thread(target=self._run, name="AsyncLogWriter", daemon=True)
+            self._thread.start()
+
+    def _after_fork(self) -> None:
+        # Process con không có writer thread: bỏ queue/handle kế thừa, start lại khi cần
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._handles = {}
+
+    def _run(self) -> None:
+        pending = []  # [(path, line, echo_line)] theo thứ tự submit
+        size = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                path, line, echo_line = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                path = None
+            if path is self._STOP:
+                self._write(pending)
+                self._close_handles()
+                return
+            if path is self._FLUSH:
+                self._write(pending)
+                pending, size, deadline = [], 0, None
+                line.set()
+                continue
+            if path is not None:
+                pending.append((path, line, echo_line))
+                size += len(line)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if size < self.flush_bytes and time.monotonic() < deadline:
+                    continue
+            self._write(pending)
+            pending, size, deadline = [], 0, None
+
+    def _write(self, pending: list) -> None:
+        if not pending:
+            return
+        today = datetime.now().date()
+        if today != self._day:
+            self._close_handles()
+            self._day = today
+        by_file = {}
+        for path, line, _ in pending:
+            by_file.setdefault(path, []).append(line)
+        max_bytes = log_rotator.max_bytes
+        for path, lines in by_file.items():
+            data = "\n".join(lines) + "\n"
+            try:
+                if path in self._locked_paths:
+                    with file_lock(path):
+                        f = self._handle(path, check_moved=bool(max_bytes))
+                        f.write(data)
+                        f.flush()
+                else:
+                    f = self._handle(path)
+                    f.write(data)
+                    f.flush()
+                if max_bytes and f.tell() >= max_bytes:
+                    f.close()
+                    del self._handles[path]
+                    log_rotator.rotate(path)
+            except Exception as e:
+                self._handles.pop(path, None)
+                print(f"Logging Error: {e}")
+        if self.echo:
+            try:
+                sys.stdout.write("".join((echo or line) + "\n" for _, line, echo in pending))
+                sys.stdout.flush()
+            except Exception:
+                pass
+
+    def _handle(self, path: str, check_moved: bool = False):
+        """File handle đang mở của path; check_moved: mở lại nếu process khác đã rotate (đổi tên) file."""
+        f = self._handles.get(path)
+        if f is not None and check_moved:
+            try:
+                moved = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+            except OSError:
+                moved = True
+            if moved:
+                f.close()
+                f = None
+        if f is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            f = self._handles[path] = open(path, "a", encoding="utf-8")
+        return f
+
+    def _close_handles(self) -> None:
+        for f in self._handles.values():
+            try:
+                f.close()
+            except Exception:
+                pass
+        self._handles = {}
+
+
+log_writer = AsyncLogWriter()
+
+
+class LogRotator:
+    """
+    Giới hạn dung lượng cây log logs/<năm>/<tháng>/<ngày>/ (mặc định tắt hết):
+    - max_bytes: logs.log vượt ngưỡng thì đổi tên thành logs.001.log, logs.002.log... (cùng ngày)
+    - compress: gzip file đã đóng (file đã rotate, file của các ngày trước) ở background thread
+    - max_days / max_total_bytes: xóa ngày cũ nhất / file cũ nhất cho tới khi đạt giới hạn,
+      kiểm tra mỗi `interval` giây ở background thread
+    Bật bằng configure(), ví dụ: log_rotator.configure(max_bytes=100 << 20, compress=True, max_days=30)
+    """
+
+    # File đã đóng quá thời gian này (giây) mới được nén, tránh nén file còn đang được ghi dở
+    _COMPRESS_MIN_AGE = 300
+    _ROTATED_RE = re.compile(r"^logs\.(\d+)(\.log|\.jsonl)(?:\.gz)?$")
+
+    def __init__(self):
+        self.max_bytes = 0
+        self.compress = False
+        self.max_days = None
+        self.max_total_bytes = None
+        self.interval = 600.0
+        self._lock = threading.Lock()
+        self._logdirs = set()  # logdir đã có log trong process này
+        self._pending = []  # file vừa rotate, chờ nén
+        self._wake = threading.Event()
+        self._thread = None
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def configure(self, max_bytes: int = 0, compress: bool = False, max_days: int = None,
+                  max_total_bytes: int = None, interval: float = 600.0) -> None:
+        self.max_bytes = max_bytes or 0
+        self.compress = compress
+        self.max_days = max_days
+        self.max_total_bytes = max_total_bytes
+        self.interval = interval
+        if compress or max_days or max_total_bytes:
+            self._start()
+            self._wake.set()
+
+    def track(self, logdir: str) -> None:
+        """Ghi nhận logdir để áp retention (mlog gọi mỗi khi sang ngày mới)."""
+        self._logdirs.add(os.path.abspath(logdir))
+
+    def rotate(self, log_file: str) -> Optional[str]:
+        """Đổi tên log_file (nếu vẫn còn vượt max_bytes) thành file đánh số kế tiếp; trả về tên mới."""
+        stem, ext = os.path.splitext(log_file)
+        with file_lock(log_file):
+            try:
+                if os.stat(log_file).st_size < self.max_bytes:
+                    return None  # Process/thread khác vừa rotate xong
+            except OSError:
+                return None
+            n = 1 + max((int(m.group(1)) for m in map(self._ROTATED_RE.match, os.listdir(os.path.dirname(log_file) or "."))
+                         if m and m.group(2) == ext), default=0)
+            rotated = f"{stem}.{n:03d}{ext}"
+            os.replace(log_file, rotated)
+        if self.compress:
+            with self._lock:
+                self._pending.append(rotated)
+            self._start()
+            self._wake.set()
+        return rotated
+
+    def run_once(self) -> None:
+        """Nén file chờ nén và áp retention ngay (thread gọi định kỳ; cũng dùng được để test)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for path in pending:
+            self._gzip(path)
+        for logdir in list(self._logdirs):
+            self._sweep(join(logdir, "logs"))
+
+    @staticmethod
+    def _gzip(path: str) -> None:
+        if not exists(path):
+            return
+        tmp = path + ".gz.tmp"
+        try:
+            with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(tmp, path + ".gz")
+            os.remove(path)
+        except OSError as e:
+            print(f"Warning: Không nén được {path}: {e}")
+            if exists(tmp):
+                os.remove(tmp)
+
+    def _sweep(self, root: str) -> None:
+        today = datetime.now().date()
+        days = list(_iter_log_days(root))
+        if self.max_days:
+            first_kept = today - timedelta(days=self.max_days - 1)
+            for day, day_dir in days:
+                if day < first_kept:
+                    shutil.rmtree(day_dir, ignore_errors=True)
+            days = [(d, p) for d, p in days if d >= first_kept]
+        if self.compress:
+            cutoff = time.time() - self._COMPRESS_MIN_AGE
+            for day, day_dir in days:
+                for name in os.listdir(day_dir):
+                    path = join(day_dir, name)
+                    if not name.startswith("logs") or not name.endswith((".log", ".jsonl")):
+                        continue
+                    # File đang ghi của hôm nay (logs.log / logs.jsonl) không nén
+                    if day == today and self._ROTATED_RE.match(name) is None:
+                        continue
+                    try:
+                        if os.stat(path).st_mtime < cutoff:
+                            self._gzip(path)
+                    except OSError:
+                        pass
+        if self.max_total_bytes:
+            files = []  # cũ nhất trước
+            for day, day_dir in days:
+                names = sorted(n for n in os.listdir(day_dir) if n.startswith("logs") and not n.endswith(".lock"))
+                for name in names:
+                    if day == today and self._ROTATED_RE.match(name) is None and not name.endswith(".gz"):
+                        continue  # không xóa file đang ghi
+                    try:
+                        files.append((join(day_dir, name), os.stat(join(day_dir, name)).st_size))
+                    except OSError:
+                        pass
+            total = sum(size for _, size in files)
+            for path, size in files:
+                if total <= self.max_total_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+                else:
+                    # File lock đi kèm (logs.log.lock) của ngày cũ: không còn ai ghi, xóa để thư mục rỗng
+                    try:
+                        os.remove(path[:-3] + ".lock" if path.endswith(".gz") else path + ".lock")
+                    except OSError:
+                        pass
+        self._remove_empty_dirs(root)
+
+    @staticmethod
+    def _remove_empty_dirs(root: str) -> None:
+        for dirpath, _, _ in sorted(os.walk(root), key=lambda w: -len(w[0])):
+            if dirpath != root:
+                try:
+                    os.rmdir(dirpath)  # chỉ xóa được thư mục rỗng
+                except OSError:
+                    pass
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="LogRotator", daemon=True)
+                self._thread.start()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pending = []
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Warning: LogRotator error: {e}")
+
+
+log_rotator = LogRotator()
+
+
+# ==================== Log reader ====================
+
+# Dòng log text: "MM/DD, HH:MM:SS [Module] [LEVEL] msg" (bản cũ không có [LEVEL])
+_TEXT_LOG_RE = re.compile(r"^(\d\d)/(\d\d), (\d\d):(\d\d):(\d\d) \[([^\]]*)\] (?:\[([A-Z0-9_-]+)\] )?(.*)$")
+
+
+def _numeric_dirs(path: str) -> List[tuple]:
+    """[(số, đường dẫn)] các thư mục con tên là số, sắp theo số."""
+    try:
+        entries = [(int(e.name), e.path) for e in os.scandir(path) if e.is_dir() and e.name.isdigit()]
+    except OSError:
+        return []
+    return sorted(entries)
+
+
+def _iter_log_days(root: str, since: datetime = None, until: datetime = None):
+    """Duyệt logs/<năm>/<tháng>/<ngày> theo thứ tự thời gian, bỏ qua cả nhánh ngoài khoảng [since, until]."""
+    first = since.date() if since else None
+    last = until.date() if until else None
+    for year, year_dir in _numeric_dirs(root):
+        if (first and year < first.year) or (last and year > last.year):
+            continue
+        for month, month_dir in _numeric_dirs(year_dir):
+            if (first and (year, month) < (first.year, first.month)) or \
+                    (last and (year, month) > (last.year, last.month)):
+                continue
+            for day, day_dir in _numeric_dirs(month_dir):
+                try:
+                    d = datetime(year, month, day).date()
+                except ValueError:
+                    continue
+                if (first and d < first) or (last and d > last):
+                    continue
+                yield d, day_dir
+
+
+def _iter_text_log(f, day) -> Any:
+    record = None
+    for line in f:
+        line = line.rstrip("\n")
+        m = _TEXT_LOG_RE.match(line)
+        if m is None:
+            if record is not None:  # dòng tiếp theo của message nhiều dòng
+                record["msg"] += "\n" + line
+            continue
+        if record is not None:
+            yield record
+        month, dom, hh, mm, ss, module, level_name, msg = m.groups()
+        try:
+            ts = datetime(day.year, int(month), int(dom), int(hh), int(mm), int(ss))
+        except ValueError:
+            record = None
+            continue
+        level_name = level_name or "2"
+        lvl = int(level_name) if level_name.isdigit() else _resolve_log_level(level_name)
+        record = {"ts": ts, "module": module, "level": level_name, "lvl": lvl, "msg": msg}
+    if record is not None:
+        yield record
+
+
+def _iter_json_log(f) -> Any:
+    for line in f:
+        try:
+            record = json.loads(line)
+            record["ts"] = datetime.fromisoformat(record["ts"])
+        except (ValueError, KeyError, TypeError):
+            continue
+        yield record
+
+
+def iter_log_records(logdir: str = ".", since: datetime = None, until: datetime = None,
+                     modules=None, level: str | int | None = None):
+    """
+    Đọc log (text và json) trong <logdir>/logs/<năm>/<tháng>/<ngày>/ dạng stream, theo thứ tự ngày.
+    Mỗi record là dict {ts (datetime), module, level, lvl, msg, extra?}.
+    Lọc: since <= ts <= until, module thuộc `modules`, lvl <= level (level "info" lấy cả error).
+    Chỉ đọc từng dòng, không load cả file vào bộ nhớ.
+    """
+    modules = set(modules) if modules else None
+    max_lvl = None if level is None else (level if isinstance(level, int) else _resolve_log_level(level))
+    for day, day_dir in _iter_log_days(join(logdir, "logs"), since, until):
+        # logs.001.log(.gz), logs.002.log ... (đã rotate) rồi mới tới logs.log đang ghi
+        names = sorted((n for n in os.listdir(day_dir) if n.startswith("logs") and
+                        n.endswith((".log", ".jsonl", ".log.gz", ".jsonl.gz"))),
+                       key=lambda n: (not n.split(".")[1].isdigit(), n))
+        for name in names:
+            path = join(day_dir, name)
+            try:
+                if name.endswith(".gz"):
+                    f = gzip.open(path, "rt", encoding="utf-8", errors="replace")
+                else:
+                    f = open(path, "r", encoding="utf-8", errors="replace")
+            except OSError as e:
+                print(f"Warning: Không đọc được {name}: {e}")
+                continue
+            with f:
+                records = _iter_json_log(f) if name.endswith((".jsonl", ".jsonl.gz")) else _iter_text_log(f, day)
+                for record in records:
+                    if since and record["ts"] < since:
+                        continue
+                    if until and record["ts"] > until:
+                        continue
+                    if modules is not None and record.get("module") not in modules:
+                        continue
+                    if max_lvl is not None and record.get("lvl", 2) > max_lvl:
+                        continue
+                    yield record
+
 
 class LLMPathManager:
     """
@@ -1,9 +1,100 @@
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta
+
+from tatools01.ParamsBase import iter_log_records, file_index, FileIndex
+
 version = "3.1.0"
+
+
+def _parse_time(text: str, end: bool = False) -> datetime:
+    """
+    '2026-10-18' hoặc '2026-10-18 08:30[:00]'; ngày không có giờ + end=True -> cuối ngày đó.
+    Có múi giờ ('2026-10-18T08:30+07:00', '...Z') -> đổi sang giờ local không múi giờ như timestamp trong log.
+    """
+    ts = datetime.fromisoformat(text.replace("Z", "+00:00") if text.endswith("Z") else text)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    if end and len(text) <= 10:
+        ts += timedelta(days=1, microseconds=-1)
+    return ts
+
+
+def logs_main(argv=None):
+    """tact logs: đọc log theo khoảng thời gian / module / level, stream từng dòng."""
+    parser = argparse.ArgumentParser(prog="tact logs", description="Đọc log trong <logdir>/logs/<năm>/<tháng>/<ngày>/")
+    parser.add_argument("logdir", nargs="?", default=".", help="Thư mục chứa logs/ (logdir của TactParameters)")
+    parser.add_argument("--since", help="Từ thời điểm: 2026-10-18, '2026-10-18 08:30' (giờ local) hoặc có múi giờ '2026-10-18T08:30+07:00'")
+    parser.add_argument("--until", help="Đến thời điểm (ngày không có giờ = hết ngày đó)")
+    parser.add_argument("-m", "--module", action="append", help="Chỉ lấy module này (lặp lại được)")
+    parser.add_argument("-l", "--level", help="Mức tối đa: error | info | debug | trace | 0-3")
+    parser.add_argument("-g", "--grep", help="Chỉ lấy message chứa chuỗi này")
+    parser.add_argument("-n", "--limit", type=int, help="Dừng sau N dòng")
+    parser.add_argument("--json", action="store_true", help="In dạng JSON lines")
+    args = parser.parse_args(argv)
+
+    level = args.level
+    if level is not None and level.isdigit():
+        level = int(level)
+    try:
+        since = _parse_time(args.since) if args.since else None
+        until = _parse_time(args.until, end=True) if args.until else None
+    except ValueError as e:
+        parser.error(f"thời điểm không hợp lệ: {e}")
+    records = iter_log_records(
+        args.logdir,
+        since=since,
+        until=until,
+        modules=args.module,
+        level=level,
+    )
+    count = 0
+    try:
+        for record in records:
+            if args.grep and args.grep not in record.get("msg", ""):
+                continue
+            if args.json:
+                line = json.dumps(dict(record, ts=record["ts"].isoformat(timespec="microseconds")),
+                                  ensure_ascii=False, default=str)
+            else:
+                line = f"{record['ts']:%Y-%m-%d %H:%M:%S.%f} [{record.get('module')}] [{record.get('level')}] {record.get('msg')}"
+                if record.get("extra"):
+                    line += f" extra={record['extra']}"
+            print(line)
+            count += 1
+            if args.limit and count >= args.limit:
+                break
+    except BrokenPipeError:  # tact logs ... | head
+        sys.stderr.close()
+
+
+def index_main(argv=None):
+    """tact index: tạo/cập nhật index file (SQLite) cho find_files(index=True)."""
+    parser = argparse.ArgumentParser(prog="tact index", description="Tạo/cập nhật index file cho find_files")
+    parser.add_argument("roots", nargs="+", help="Thư mục gốc cần index")
+    parser.add_argument("--db", help=f"File index (mặc định {file_index.db_path})")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="Số thread stat/scandir song song")
+    args = parser.parse_args(argv)
+
+    index = FileIndex(args.db) if args.db else file_index
+    for root in args.roots:
+        stats = index.refresh(root, workers=args.workers)
+        print(f"{root}: {stats['files']} file, {stats['dirs']} thư mục "
+              f"(quét lại {stats['scanned']}, xóa {stats['removed']}) trong {stats['seconds']}s")
+
+
 def console_main():
+    if sys.argv[1:2] == ["logs"]:
+        return logs_main(sys.argv[2:])
+    if sys.argv[1:2] == ["index"]:
+        return index_main(sys.argv[2:])
     print(
         f"""
 ver: {version} - tatools01
 1. tact
+2. tact logs [logdir] [--since ...] [--until ...] [-m Module] [-l info] [-g text] [--json]
+3. tact index <root> [<root> ...] [--db file.sqlite] [-w 8]
         """
     )
           
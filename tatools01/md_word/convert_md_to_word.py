@@ -5,6 +5,11 @@ Cách sử dụng:
     python convert_md_to_word.py <đường_dẫn>                           # Chuyển file/thư mục
     python convert_md_to_word.py <đường_dẫn> --autofit content         # Table autofit to content
     python convert_md_to_word.py <đường_dẫn> --autofit window          # Table autofit to window (mặc định)
+    python convert_md_to_word.py <thư_mục> -r --jobs 8                 # Convert song song 8 process
+    python convert_md_to_word.py <thư_mục> -r --incremental            # Chỉ convert file .md đã đổi
+    python convert_md_to_word.py <thư_mục> -r --engine direct          # Dựng docx thẳng từ cây Markdown
+    python convert_md_to_word.py <file_lớn.md> --stream                # Convert từng khối, RAM giới hạn
+    python convert_md_to_word.py <thư_mục> -r --template mau.dotx      # Dùng style/trang của template
 
 Ví dụ:
     python convert_md_to_word.py .
@@ -18,7 +23,20 @@ Yêu cầu cài đặt:
 import sys
 import os
 import io
+import re
+import html
+import json
+import time
+import shutil
+import zipfile
+import hashlib
 import argparse
+import tempfile
+import contextlib
+from copy import deepcopy
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Fix encoding for Windows console
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -28,13 +46,17 @@ from typing import List
 
 try:
     from docx import Document
-    from docx.shared import Pt, Inches, RGBColor, Cm
+    from docx.shared import Pt, Inches, RGBColor, Cm, Emu
+    from docx.section import Section
     from docx.enum.text import WD_ALIGN_PARAGRAPH
     from docx.enum.style import WD_STYLE_TYPE
     from docx.enum.table import WD_TABLE_ALIGNMENT
-    from docx.oxml.ns import nsdecls
+    from docx.oxml.ns import nsdecls, qn
     from docx.oxml import parse_xml
+    from lxml import etree
     import markdown
+    from markdown import util as md_util
+    from markdown.extensions.codehilite import CodeHilite
     from bs4 import BeautifulSoup
 except ImportError as e:
     print(f"Lỗi: Thiếu thư viện. Vui lòng cài đặt bằng lệnh:")
@@ -120,6 +142,12 @@ def process_html_element(doc: Document, element, current_list_level: int = 0, au
         para = doc.add_paragraph('─' * 50)
         para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
+    elif element.name == 'div' and 'codehilite' in (element.get('class') or []):
+        # Code block đã được pygments tô màu: <div class="codehilite"><pre>...</pre></div>
+        pre = element.find('pre')
+        if pre is not None:
+            process_html_element(doc, pre, autofit_mode=autofit_mode)
+
 
 def process_inline_elements(paragraph, element):
     """Xử lý các inline elements (bold, italic, code, link)"""
@@ -151,12 +179,17 @@ def process_inline_elements(paragraph, element):
                 paragraph.add_run(text)
 
 
+_shading_templates = {}
+
+
 def set_cell_shading(cell, color_hex: str):
-    """Thiết lập màu nền cho cell"""
-    shading_elm = parse_xml(
-        f'<w:shd {nsdecls("w")} w:fill="{color_hex}" w:val="clear"/>'
-    )
-    cell._tc.get_or_add_tcPr().append(shading_elm)
+    """Thiết lập màu nền cho cell (element <w:shd> parse 1 lần cho mỗi màu rồi deepcopy)"""
+    shading_elm = _shading_templates.get(color_hex)
+    if shading_elm is None:
+        shading_elm = _shading_templates[color_hex] = parse_xml(
+            f'<w:shd {nsdecls("w")} w:fill="{color_hex}" w:val="clear"/>'
+        )
+    cell._tc.get_or_add_tcPr().append(deepcopy(shading_elm))
 
 
 def set_table_borders(table, num_rows: int):
@@ -254,51 +287,60 @@ def set_table_autofit(table, mode: str = 'window'):
 
 def process_table(doc: Document, table_element, autofit_mode: str = 'window'):
     """Xử lý bảng HTML và tạo bảng Word với định dạng đẹp"""
-    rows = table_element.find_all('tr')
+    rows = [[(cell.name == 'th', cell.get_text().strip()) for cell in row.find_all(['th', 'td'])]
+            for row in table_element.find_all('tr')]
+    add_table(doc, rows, autofit_mode)
+
+
+def add_table(doc: Document, rows: list, autofit_mode: str = 'window'):
+    """
+    Tạo bảng Word từ rows = [[(is_header, text), ...], ...].
+    Dùng chung cho engine html (process_table) và engine direct.
+    """
     if not rows:
         return
 
     # Đếm số cột từ row đầu tiên
-    first_row = rows[0]
-    cols = first_row.find_all(['th', 'td'])
-    num_cols = len(cols)
+    num_cols = len(rows[0])
 
     if num_cols == 0:
         return
 
-    # Tạo bảng Word
-    table = doc.add_table(rows=len(rows), cols=num_cols)
+    # Tạo bảng Word: python-docx chỉ tạo 1 row mẫu, các row còn lại được dựng bằng deepcopy
+    # từ template cell (tcPr + shading + run đã định dạng) rồi gắn thẳng vào <w:tbl>.
+    # Không dùng table.rows[i].cells[j]: mỗi lần truy cập dựng lại list row/cell -> bậc 2 theo số dòng.
+    table = _new_table(doc, num_cols)
     table.style = 'Table Grid'
     table.alignment = WD_TABLE_ALIGNMENT.CENTER
 
-    # Màu sắc cho bảng
-    HEADER_BG_COLOR = "4472C4"  # Màu xanh dương đậm cho header row
-    FIRST_COL_BG_COLOR = "D6DCE5"  # Màu xám nhạt cho first column
-    ALT_ROW_COLOR = "F2F2F2"  # Màu xám rất nhạt cho alternate rows
-
-    for row_idx, row in enumerate(rows):
-        cells = row.find_all(['th', 'td'])
-        for col_idx, cell in enumerate(cells):
-            if col_idx < num_cols:
-                table_cell = table.rows[row_idx].cells[col_idx]
-                table_cell.text = cell.get_text().strip()
-
-                # Định dạng cho header row (row đầu tiên)
-                if row_idx == 0 or cell.name == 'th':
-                    set_cell_shading(table_cell, HEADER_BG_COLOR)
-                    for para in table_cell.paragraphs:
-                        for run in para.runs:
-                            run.bold = True
-                            run.font.color.rgb = RGBColor(255, 255, 255)  # Chữ trắng
-                # Định dạng cho first column (trừ header)
-                elif col_idx == 0:
-                    set_cell_shading(table_cell, FIRST_COL_BG_COLOR)
-                    for para in table_cell.paragraphs:
-                        for run in para.runs:
-                            run.bold = True
-                # Alternate row colors cho các cell còn lại
-                elif row_idx % 2 == 0:
-                    set_cell_shading(table_cell, ALT_ROW_COLOR)
+    tbl = table._tbl
+    proto_tr = tbl.tr_lst[0]
+    templates = {kind: _table_cell_template(table, kind) for kind in ('header', 'first_col', 'alt_row', 'plain')}
+    tbl.remove(proto_tr)
+    proto_tc = proto_tr.tc_lst[0]
+    for tc in proto_tr.tc_lst:
+        proto_tr.remove(tc)
+
+    for row_idx, cells in enumerate(rows):
+        tr = deepcopy(proto_tr)
+        for col_idx in range(num_cols):
+            if col_idx >= len(cells):
+                tr.append(deepcopy(proto_tc))
+                continue
+            is_header, text = cells[col_idx]
+            # Định dạng: header row (row đầu tiên hoặc <th>), first column, alternate row, còn lại
+            if row_idx == 0 or is_header:
+                kind = 'header'
+            elif col_idx == 0:
+                kind = 'first_col'
+            elif row_idx % 2 == 0:
+                kind = 'alt_row'
+            else:
+                kind = 'plain'
+            tc = deepcopy(templates[kind])
+            _set_template_cell_text(tc, text)
+            tr.append(tc)
+        tbl.append(tr)
 
     # Thiết lập border cho table
     set_table_borders(table, len(rows))
@@ -310,6 +352,68 @@ def process_table(doc: Document, table_element, autofit_mode: str = 'window'):
     doc.add_paragraph()
 
 
+# Màu sắc cho bảng
+HEADER_BG_COLOR = "4472C4"  # Màu xanh dương đậm cho header row
+FIRST_COL_BG_COLOR = "D6DCE5"  # Màu xám nhạt cho first column
+ALT_ROW_COLOR = "F2F2F2"  # Màu xám rất nhạt cho alternate rows
+
+
+def _new_table(doc: Document, num_cols: int):
+    """
+    Bảng 1 dòng, rộng bằng vùng giữa 2 lề của section cuối.
+    doc.add_table tra section cuối bằng xpath trên toàn bộ body mỗi lần gọi (chậm khi body lớn)
+    -> đọc thẳng sectPr của body; thiếu sectPr/pgSz/pgMar thì dùng doc.add_table (có giá trị mặc định).
+    """
+    sectPr = doc.element.body.sectPr
+    if sectPr is not None:
+        section = Section(sectPr, doc.part)
+        page_width, left, right = section.page_width, section.left_margin, section.right_margin
+        if page_width is not None and left is not None and right is not None:
+            return doc._body.add_table(1, num_cols, Emu(page_width - left - right))
+    return doc.add_table(1, num_cols)
+
+
+def _table_cell_template(table, kind: str):
+    """
+    Tạo 1 cell mẫu (có text giả 'x') đã định dạng theo kind, bằng đúng các API python-docx như trước:
+    thêm 1 row tạm vào table, định dạng cell đầu, lấy <w:tc> ra rồi bỏ row đó.
+    """
+    row = table.add_row()
+    table_cell = row.cells[0]
+    table_cell.text = 'x'
+    if kind == 'header':
+        set_cell_shading(table_cell, HEADER_BG_COLOR)
+        for para in table_cell.paragraphs:
+            for run in para.runs:
+                run.bold = True
+                run.font.color.rgb = RGBColor(255, 255, 255)  # Chữ trắng
+    elif kind == 'first_col':
+        set_cell_shading(table_cell, FIRST_COL_BG_COLOR)
+        for para in table_cell.paragraphs:
+            for run in para.runs:
+                run.bold = True
+    elif kind == 'alt_row':
+        set_cell_shading(table_cell, ALT_ROW_COLOR)
+    tc = table_cell._tc
+    table._tbl.remove(row._tr)
+    return tc
+
+
+def _set_template_cell_text(tc, text: str):
+    """
+    Đặt text cho bản copy của cell mẫu (_table_cell_template). Giả định về cấu trúc XML, chỉ đúng
+    với cell mẫu: <w:tc> có đúng 1 <w:p>, trong đó đúng 1 <w:r> gồm <w:rPr>? rồi <w:t>x</w:t> ở cuối.
+    """
+    r = tc.find(qn('w:p')).find(qn('w:r'))
+    t = r[-1]
+    if not text:
+        r.remove(t)
+    elif text == text.strip() and '\t' not in text and '\n' not in text and '\r' not in text:
+        t.text = text
+    else:
+        r.text = text  # tab/xuống dòng/khoảng trắng đầu cuối: để python-docx xử lý
+
+
 def setup_page_format(doc: Document):
     """Thiết lập định dạng trang: A4, margins"""
     for section in doc.sections:
@@ -324,43 +428,501 @@ def setup_page_format(doc: Document):
         section.right_margin = Cm(2)
 
 
-def convert_md_file_to_docx(md_path: Path, output_path: Path, autofit_mode: str = 'window'):
-    """Chuyển đổi một file MD sang DOCX"""
+# =========================
+# ENGINE DIRECT: Markdown etree -> docx (không qua HTML string + BeautifulSoup)
+# =========================
+ENGINES = ('html', 'direct')
+
+# Không dùng codehilite: engine direct lấy thẳng text của code block, không cần pygments
+_DIRECT_EXTENSIONS = ['tables', 'fenced_code', 'toc', 'nl2br']
+_direct_md = None
+# Placeholder của block đã cất vào htmlStash (HTML thô, fenced code), dựng từ hằng số public của
+# python-markdown thay vì chép chuỗi '\x02wzxhzdk:%s\x03' (đổi theo phiên bản)
+_STASH_PREFIX, _STASH_SUFFIX = md_util.HTML_PLACEHOLDER.split('%s')
+_STASH_RE = re.compile('^' + re.escape(_STASH_PREFIX) + r'(\d+)' + re.escape(_STASH_SUFFIX) + '$')
+_STASHED_CODE_RE = re.compile(r'^<pre(?: [^>]*)?><code(?: [^>]*)?>(.*)</code></pre>$', re.S)
+
+
+def markdown_to_tree(md_content: str):
+    """
+    Chạy pipeline của python-markdown tới hết treeprocessors (giống Markdown.convert)
+    nhưng dừng trước bước serialize HTML. Trả về (md, root) - root là cây ElementTree.
+    Instance Markdown được dùng lại trong process (reset mỗi lần).
+    """
+    global _direct_md
+    if _direct_md is None:
+        _direct_md = markdown.Markdown(extensions=_DIRECT_EXTENSIONS)
+    md = _direct_md
+    md.reset()
+    lines = md_content.split("\n")
+    for prep in md.preprocessors:
+        lines = prep.run(lines)
+    root = md.parser.parseDocument(lines).getroot()
+    for treeprocessor in md.treeprocessors:
+        new_root = treeprocessor.run(root)
+        if new_root is not None:
+            root = new_root
+    return md, root
+
+
+def _tree_text(element) -> str:
+    """Tương đương get_text() của BeautifulSoup cho element của cây Markdown."""
+    parts = []
+    _collect_tree_text(element, parts)
+    return ''.join(parts)
+
+
+def _collect_tree_text(element, parts: list):
+    if element.text:
+        # Text trong <code> đã bị code_escape (&, <, >) từ lúc parse
+        parts.append(html.unescape(element.text) if element.tag == 'code' else element.text)
+    for child in element:
+        _collect_tree_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+def _has_stash(element) -> bool:
+    """Element có chứa placeholder (HTML thô, entity...) cần bước postprocess của HTML không."""
+    stx = md_util.STX
+    for e in element.iter():
+        if (e.text and stx in e.text) or (e.tail and stx in e.tail):
+            return True
+    return False
+
+
+def _hilite_text(src: str, header: bool = False) -> str:
+    """
+    Text của code block giống khi đi qua codehilite + pygments ở engine html: bỏ dòng trống
+    đầu/cuối, luôn kết thúc bằng '\n'; header=True (code block thụt lề): bỏ dòng ':::lang'/'#!lang'.
+    """
+    src = src.strip('\n')
+    if header and src.startswith((':::', '#!')):
+        highlighter = CodeHilite(src)
+        highlighter._parseHeader()
+        src = highlighter.src
+    return src + '\n'
+
+
+class TreeRenderer:
+    """
+    Dựng docx từ cây Markdown, cho kết quả giống process_html_element/process_inline_elements.
+    Style id được tra 1 lần cho mỗi document (python-docx quét toàn bộ styles mỗi lần
+    add_paragraph(style=tên)).
+    """
+
+    def __init__(self, doc: Document, md, autofit_mode: str = 'window'):
+        self.doc = doc
+        self.md = md
+        self.autofit_mode = autofit_mode
+        self._style_ids = {}
+
+    def render(self, root):
+        for element in root:
+            self.block(element)
+
+    def paragraph(self, style: str = None, text: str = None):
+        """Giống doc.add_paragraph(text, style) nhưng dùng style id đã cache"""
+        para = self.doc.add_paragraph()
+        if text:
+            para.add_run(text)
+        if style is not None:
+            style_id = self._style_ids.get(style)
+            if style_id is None:
+                style_id = self._style_ids[style] = self.doc.part.get_style_id(style, WD_STYLE_TYPE.PARAGRAPH)
+            para._p.style = style_id
+        return para
+
+    def code_block(self, code_text: str):
+        para = self.paragraph()
+        run = para.add_run(code_text)
+        run.font.name = 'Consolas'
+        run.font.size = Pt(9)
+        para.paragraph_format.left_indent = Inches(0.3)
+
+    def inline(self, paragraph, element):
+        """Giống process_inline_elements"""
+        if element.text and element.text.strip():
+            paragraph.add_run(element.text)
+        for child in element:
+            tag = child.tag
+            if tag == 'strong' or tag == 'b':
+                run = paragraph.add_run(_tree_text(child))
+                run.bold = True
+            elif tag == 'em' or tag == 'i':
+                run = paragraph.add_run(_tree_text(child))
+                run.italic = True
+            elif tag == 'code':
+                run = paragraph.add_run(_tree_text(child))
+                run.font.name = 'Consolas'
+                run.font.size = Pt(9)
+            elif tag == 'a':
+                run = paragraph.add_run(_tree_text(child))
+                run.font.color.rgb = RGBColor(0, 0, 255)
+                run.underline = True
+            elif tag in ['span', 'p']:
+                self.inline(paragraph, child)
+            else:
+                text = _tree_text(child)
+                if text.strip():
+                    paragraph.add_run(text)
+            if child.tail and child.tail.strip():
+                paragraph.add_run(child.tail)
+
+    def block(self, element):
+        """Giống process_html_element, cho element top-level"""
+        tag = element.tag
+
+        if tag == 'p' and len(element) == 0 and element.text and _STASH_RE.match(element.text):
+            # Block đã được cất vào htmlStash: fenced code hoặc HTML thô
+            raw = self.md.htmlStash.rawHtmlBlocks[int(_STASH_RE.match(element.text).group(1))]
+            m = _STASHED_CODE_RE.match(raw) if isinstance(raw, str) else None
+            if m:
+                self.code_block(_hilite_text(html.unescape(m.group(1))))
+                return
+
+        if _has_stash(element):
+            # Hiếm gặp (HTML thô, entity...): đi đường HTML cho riêng element này để kết quả giống hệt
+            html_content = self.md.serializer(element)
+            for pp in self.md.postprocessors:
+                html_content = pp.run(html_content)
+            for child in BeautifulSoup(html_content, 'html.parser').children:
+                if child.name:
+                    process_html_element(self.doc, child, autofit_mode=self.autofit_mode)
+            return
+
+        if tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            self.paragraph(f"Heading {tag[1]}", _tree_text(element).strip())
+
+        elif tag == 'p':
+            self.inline(self.paragraph(), element)
+
+        elif tag == 'ul':
+            for li in element.findall('li'):
+                self.inline(self.paragraph('List Bullet'), li)
+                # Xử lý nested lists
+                nested_ul = li.find('.//ul')
+                if nested_ul is not None:
+                    for nested_li in nested_ul.findall('li'):
+                        self.inline(self.paragraph('List Bullet 2'), nested_li)
+
+        elif tag == 'ol':
+            for li in element.findall('li'):
+                self.inline(self.paragraph('List Number'), li)
+
+        elif tag == 'pre':
+            self.code_block(_hilite_text(_tree_text(element), header=True))
+
+        elif tag == 'table':
+            rows = [[(cell.tag == 'th', _tree_text(cell).strip()) for cell in tr if cell.tag in ('th', 'td')]
+                    for tr in element.iter('tr')]
+            add_table(self.doc, rows, self.autofit_mode)
+
+        elif tag == 'blockquote':
+            para = self.paragraph()
+            para.paragraph_format.left_indent = Inches(0.5)
+            self.inline(para, element)
+
+        elif tag == 'hr':
+            para = self.paragraph(text='─' * 50)
+            para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+
+# =========================
+# STREAMING: file .md rất lớn, convert từng khối, RAM không tăng theo kích thước file
+# =========================
+STREAM_CHUNK_CHARS = 64 << 10
+
+_FENCE_RE = re.compile(r'^(?:~{3,}|`{3,})')
+# Dòng có thể thuộc block phía trước dù có dòng trống ở giữa: thụt lề, blockquote, list item, HTML thô
+_CONTINUATION_RE = re.compile(r'^(?:[ \t>]|[-*+][ \t]|\d+[.)][ \t]|<)')
+_NS_DECL_RE = re.compile(rb' xmlns(?::\w+)?="[^"]*"')
+
+
+def iter_md_blocks(f, chunk_chars: int = STREAM_CHUNK_CHARS):
+    """
+    Đọc file Markdown (đã mở ở text mode) theo từng khối khoảng chunk_chars ký tự.
+    Chỉ cắt ở dòng trống ngoài fenced code, trước dòng bắt đầu block mới (heading, đoạn văn,
+    bảng, fence...) - không cắt giữa bảng, code block, list hay blockquote.
+    Giới hạn: định nghĩa link kiểu tham chiếu ([x]: url) chỉ có tác dụng trong cùng khối.
+    """
+    lines = []
+    size = 0
+    fence = None
+    blank_before = False
+    for line in f:
+        if (fence is None and blank_before and size >= chunk_chars and line.strip()
+                and not _CONTINUATION_RE.match(line)):
+            yield ''.join(lines)
+            lines = []
+            size = 0
+        lines.append(line)
+        size += len(line)
+        if fence is None:
+            m = _FENCE_RE.match(line)
+            if m:
+                fence = m.group(0)
+            blank_before = not line.strip()
+        elif line.rstrip('\r\n').rstrip(' ') == fence:
+            fence = None
+            blank_before = False
+    if lines:
+        yield ''.join(lines)
+
+
+def _write_streamed_docx(saved_docx, body_parts, output_path: Path):
+    """Ghi file .docx: copy mọi part của saved_docx, chèn body_parts (file tạm) vào <w:body> của document.xml"""
+    with zipfile.ZipFile(saved_docx) as src, zipfile.ZipFile(str(output_path), 'w', zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            if item.filename != 'word/document.xml':
+                dst.writestr(item, src.read(item))
+                continue
+            head, tail = src.read(item).split(b'<w:body>', 1)
+            with dst.open(item, 'w', force_zip64=True) as out:
+                out.write(head + b'<w:body>')
+                shutil.copyfileobj(body_parts, out, 1 << 20)
+                out.write(tail)
+
+
+def convert_md_stream(md_path: Path, output_path: Path, autofit_mode: str = 'window',
+                      chunk_chars: int = STREAM_CHUNK_CHARS, template: str = None):
+    """
+    Convert kiểu streaming (engine direct): đọc từng khối Markdown, dựng docx cho khối đó,
+    serialize các element của body ra file tạm rồi bỏ khỏi cây. Cuối cùng ghép vào document.xml.
+    Bộ nhớ đỉnh phụ thuộc chunk_chars, không phụ thuộc kích thước file. Output giống engine direct.
+    """
+    doc = new_document(template)
+    body = doc.element.body
+    sectPr = body.sectPr
+    renderer = TreeRenderer(doc, None, autofit_mode)
+    with tempfile.TemporaryFile() as body_parts:
+        with open(md_path, 'r', encoding='utf-8') as f:
+            for block in iter_md_blocks(f, chunk_chars):
+                renderer.md, root = markdown_to_tree(block)
+                renderer.render(root)
+                for element in list(body):
+                    if element is sectPr:
+                        continue
+                    xml = etree.tostring(element, encoding='UTF-8')
+                    # Namespace đã khai báo ở <w:document>, bỏ khai báo lặp lại ở tag đầu của element
+                    end = xml.index(b'>')
+                    body_parts.write(_NS_DECL_RE.sub(b'', xml[:end]) + xml[end:])
+                    body.remove(element)
+        saved = io.BytesIO()
+        doc.save(saved)
+        body_parts.seek(0)
+        _write_streamed_docx(saved, body_parts, output_path)
+
+
+# =========================
+# TEMPLATE: document gốc đã định dạng, chuẩn bị 1 lần mỗi process rồi clone cho từng file
+# =========================
+# Các style mà converter dùng; template của người dùng thiếu style nào thì copy từ template mặc định
+REQUIRED_STYLES = ['Normal', 'Heading 1', 'Heading 2', 'Heading 3', 'Heading 4', 'Heading 5', 'Heading 6',
+                   'List Bullet', 'List Bullet 2', 'List Number', 'Table Grid']
+_DOTM_MAIN = b'application/vnd.ms-word.template.macroEnabledTemplate.main+xml'
+_DOTX_MAIN = b'application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml'
+_DOCX_MAIN = b'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml'
+_template_cache = {}
+_PAGE_ATTRS = ('page_width', 'page_height', 'top_margin', 'bottom_margin', 'left_margin', 'right_margin')
+
+
+def _open_template(template: str) -> Document:
+    """Mở file .docx/.dotx; .dotx được đổi content type của part chính để python-docx chấp nhận"""
+    with open(template, 'rb') as f:
+        data = f.read()
+    with zipfile.ZipFile(io.BytesIO(data)) as src:
+        content_types = src.read('[Content_Types].xml')
+        if _DOTX_MAIN not in content_types and _DOTM_MAIN not in content_types:
+            return Document(io.BytesIO(data))
+        patched = io.BytesIO()
+        with zipfile.ZipFile(patched, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                blob = src.read(item)
+                if item.filename == '[Content_Types].xml':
+                    blob = blob.replace(_DOTX_MAIN, _DOCX_MAIN).replace(_DOTM_MAIN, _DOCX_MAIN)
+                dst.writestr(item, blob)
+    return Document(patched)
+
+
+def _prepare_template(template: str = None) -> Document:
+    """
+    Document gốc cho mọi lần convert.
+    template=None: template mặc định của python-docx + A4/margins + style Normal (Cambria 12).
+    template=file .docx/.dotx: giữ nguyên trang và style của file, bỏ nội dung body,
+    bổ sung style còn thiếu trong REQUIRED_STYLES.
+    """
+    if template is None:
+        # Tạo document Word
+        doc = Document()
+
+        # Thiết lập định dạng trang (A4, margins)
+        setup_page_format(doc)
+
+        # Thiết lập styles
+        style = doc.styles['Normal']
+        # style.font.name = 'Times New Roman'
+        style.font.name = 'Cambria'
+        style.font.size = Pt(12)
+        return doc
+
+    doc = _open_template(template)
+    body = doc.element.body
+    sectPr = body.get_or_add_sectPr()
+    for element in list(body):
+        if element is not sectPr:
+            body.remove(element)
+
+    default_doc = Document()
+    setup_page_format(default_doc)
+
+    # Khổ giấy / lề thiếu (sectPr không có pgSz/pgMar): add_table cần để tính độ rộng bảng
+    section, default_section = doc.sections[0], default_doc.sections[0]
+    page_attrs = [attr for attr in _PAGE_ATTRS if getattr(section, attr) is None]
+    for attr in page_attrs:
+        setattr(section, attr, getattr(default_section, attr))
+    if page_attrs:
+        print(f"Warning: template '{template}' thiếu khổ giấy/lề trang ({', '.join(page_attrs)}), "
+              f"dùng A4 và lề mặc định")
+
+    default_styles = default_doc.styles
+    styles_element = doc.styles.element
+    missing = []
+    num_ids = {}
+    for name in REQUIRED_STYLES:
+        style = default_styles[name]
+        # Style thiếu và các style nó kế thừa (basedOn)
+        while style is not None and styles_element.get_by_id(style.style_id) is None:
+            element = deepcopy(style.element)
+            _copy_style_numbering(element, default_doc, doc, num_ids)
+            styles_element.append(element)
+            missing.append(style.name)
+            style = style.base_style
+    if missing:
+        print(f"Warning: template '{template}' thiếu style {', '.join(missing)}, dùng style mặc định")
+    return doc
+
+
+def _copy_style_numbering(style_element, src_doc: Document, dst_doc: Document, num_ids: dict):
+    """
+    Style copy từ template mặc định (List Bullet, List Number...) có w:numPr/w:numId trỏ vào
+    numbering part của template mặc định: copy w:num và w:abstractNum tương ứng sang numbering
+    part của template với id mới, rồi sửa numId trong style cho khớp.
+    num_ids: numId cũ -> numId mới, để nhiều style dùng chung 1 định nghĩa chỉ copy 1 lần.
+    """
+    for num_id in style_element.xpath('./w:pPr/w:numPr/w:numId'):
+        old_id = num_id.get(qn('w:val'))
+        if old_id not in num_ids:
+            num_ids[old_id] = _copy_numbering(src_doc.part.numbering_part.element,
+                                              dst_doc.part.numbering_part.element, old_id)
+        if num_ids[old_id] is None:
+            # Không tìm thấy định nghĩa: bỏ numPr, style vẫn dùng được nhưng không đánh số
+            num_id.getparent().getparent().remove(num_id.getparent())
+        else:
+            num_id.set(qn('w:val'), num_ids[old_id])
+
+
+def _copy_numbering(src, dst, old_id: str):
+    """Copy w:num numId=old_id và w:abstractNum của nó từ numbering src sang dst; trả về numId mới."""
+    nums = src.xpath(f'./w:num[@w:numId="{old_id}"]')
+    if not nums:
+        return None
+    num = deepcopy(nums[0])
+    abstract_ref = num.find(qn('w:abstractNumId'))
+    abstracts = src.xpath(f'./w:abstractNum[@w:abstractNumId="{abstract_ref.get(qn("w:val"))}"]')
+    if not abstracts:
+        return None
+    abstract = deepcopy(abstracts[0])
+
+    new_abstract_id = str(max(map(int, dst.xpath('./w:abstractNum/@w:abstractNumId')), default=-1) + 1)
+    new_id = str(max(map(int, dst.xpath('./w:num/@w:numId')), default=0) + 1)
+    abstract.set(qn('w:abstractNumId'), new_abstract_id)
+    abstract_ref.set(qn('w:val'), new_abstract_id)
+    num.set(qn('w:numId'), new_id)
+
+    # Thứ tự theo schema: w:numPicBullet*, w:abstractNum*, w:num*, w:numIdMacAtCleanup?
+    existing_abstracts = dst.findall(qn('w:abstractNum'))
+    existing_nums = dst.findall(qn('w:num'))
+    if existing_abstracts:
+        existing_abstracts[-1].addnext(abstract)
+    elif existing_nums:
+        existing_nums[0].addprevious(abstract)
+    else:
+        pic_bullets = dst.findall(qn('w:numPicBullet'))
+        if pic_bullets:
+            pic_bullets[-1].addnext(abstract)
+        else:
+            dst.insert(0, abstract)
+    (existing_nums[-1] if existing_nums else abstract).addnext(num)
+    return new_id
+
+
+def new_document(template: str = None) -> Document:
+    """
+    Document Word trống để convert: clone document gốc đã chuẩn bị sẵn, thay vì mỗi file lại
+    mở template từ đĩa, thiết lập trang và style. Document gốc được cache theo
+    (template, mtime, size) trong process.
+    Chỉ document part (body) được copy; các part khác (styles, numbering, theme, settings...)
+    dùng chung giữa các bản clone vì lúc convert chỉ đọc, không sửa.
+    """
+    key = None
+    if template is not None:
+        template = os.path.abspath(template)
+        st = os.stat(template)
+        key = (template, st.st_mtime_ns, st.st_size)
+    base = _template_cache.get(key)
+    if base is None:
+        base = _template_cache[key] = _prepare_template(template)
+    shared = {id(part): part for part in base.part.package.iter_parts() if part is not base.part}
+    return deepcopy(base, shared)
+
+
+def convert_md_file_to_docx(md_path: Path, output_path: Path, autofit_mode: str = 'window',
+                            engine: str = 'html', stream: bool = False, template: str = None):
+    """
+    Chuyển đổi một file MD sang DOCX.
+    engine='html': MD -> HTML string -> BeautifulSoup -> docx (mặc định).
+    engine='direct': đi thẳng từ cây Markdown sang docx, bỏ qua serialize/parse HTML và pygments.
+    stream=True: convert từng khối với engine direct (file .md rất lớn), xem convert_md_stream.
+    template: file .docx/.dotx dùng làm document gốc (trang, style), xem new_document.
+    """
     print(f"  Đang xử lý: {md_path.name}")
 
+    if stream:
+        convert_md_stream(md_path, output_path, autofit_mode, template=template)
+        print(f"  ✓ Đã tạo: {output_path.name}")
+        return
+
     # Đọc file MD
     with open(md_path, 'r', encoding='utf-8') as f:
         md_content = f.read()
 
-    # Chuyển MD sang HTML
-    html_content = convert_md_to_html(md_content)
-
-    # Parse HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Tạo document Word
-    doc = Document()
+    if engine == 'direct':
+        md, root = markdown_to_tree(md_content)
+    else:
+        # Chuyển MD sang HTML
+        html_content = convert_md_to_html(md_content)
 
-    # Thiết lập định dạng trang (A4, margins)
-    setup_page_format(doc)
+        # Parse HTML
+        soup = BeautifulSoup(html_content, 'html.parser')
 
-    # Thiết lập styles
-    style = doc.styles['Normal']
-    # style.font.name = 'Times New Roman'
-    style.font.name = 'Cambria'
-    style.font.size = Pt(12)
+    doc = new_document(template)
 
     # Xử lý từng element
-    for element in soup.children:
-        if element.name:
-            process_html_element(doc, element, autofit_mode=autofit_mode)
+    if engine == 'direct':
+        TreeRenderer(doc, md, autofit_mode).render(root)
+    else:
+        for element in soup.children:
+            if element.name:
+                process_html_element(doc, element, autofit_mode=autofit_mode)
 
     # Lưu file
     doc.save(str(output_path))
     print(f"  ✓ Đã tạo: {output_path.name}")
 
 
-def convert_single_file(file_path: str, autofit_mode: str = 'window'):
+def convert_single_file(file_path: str, autofit_mode: str = 'window', engine: str = 'html',
+                        stream: bool = False, template: str = None):
     """Chuyển đổi một file MD cụ thể sang DOCX"""
     md_path = Path(file_path)
 
@@ -381,7 +943,7 @@ def convert_single_file(file_path: str, autofit_mode: str = 'window'):
 
     try:
         output_file = md_path.with_suffix('.docx')
-        convert_md_file_to_docx(md_path, output_file, autofit_mode)
+        convert_md_file_to_docx(md_path, output_file, autofit_mode, engine, stream, template)
         print(f"\n{'='*50}")
         print(f"Hoàn thành!")
         print(f"  - File output: {output_file}")
@@ -390,7 +952,174 @@ def convert_single_file(file_path: str, autofit_mode: str = 'window'):
         sys.exit(1)
 
 
-def convert_all_md_in_directory(directory: str, autofit_mode: str = 'window'):
+# Tăng khi thay đổi cách render (style, bảng...) để --incremental build lại toàn bộ
+CONVERTER_VERSION = "2"
+MANIFEST_NAME = ".md2w-manifest.json"
+
+
+def build_options(autofit_mode: str = 'window', engine: str = 'html', stream: bool = False,
+                  template: str = None) -> dict:
+    """
+    Các tùy chọn ảnh hưởng tới file .docx output: tham số của convert_md_file_to_docx,
+    đồng thời được ghi vào manifest của --incremental.
+    stream=True luôn chạy engine direct (convert_md_stream) -> ghi đúng engine đó.
+    """
+    if stream:
+        engine = 'direct'
+    return {"autofit_mode": autofit_mode, "engine": engine, "stream": stream,
+            "template": os.path.abspath(template) if template else None}
+
+
+def file_digest(path) -> str:
+    """Hash nội dung file (blake2b 128 bit)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BuildManifest:
+    """
+    Manifest cho build incremental, lưu ở <root>/.md2w-manifest.json:
+    file .md (đường dẫn tương đối) -> hash nội dung, size/mtime, version converter, options.
+    File chỉ cần build lại khi nội dung, version, options đổi hoặc file .docx không còn.
+    Hash chỉ tính lại khi size/mtime của file .md đổi (như git index).
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.path = self.root / MANIFEST_NAME
+        self.entries = {}
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("format") == 1:
+                self.entries = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def _key(self, md_path: Path) -> str:
+        try:
+            return Path(md_path).resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return Path(md_path).resolve().as_posix()
+
+    def source_info(self, md_path: Path) -> dict:
+        st = os.stat(md_path)
+        old = self.entries.get(self._key(md_path))
+        if old and old.get("size") == st.st_size and old.get("mtime_ns") == st.st_mtime_ns:
+            digest = old["sha"]
+        else:
+            digest = file_digest(md_path)
+        return {"sha": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def needs_build(self, md_path: Path, info: dict, options: dict) -> bool:
+        old = self.entries.get(self._key(md_path))
+        return (old is None or old.get("sha") != info["sha"] or old.get("version") != CONVERTER_VERSION
+                or old.get("options") != options or not Path(md_path).with_suffix('.docx').exists())
+
+    def record(self, md_path: Path, info: dict, options: dict) -> None:
+        self.entries[self._key(md_path)] = dict(info, version=CONVERTER_VERSION, options=options)
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        fd, tmp = tempfile.mkstemp(dir=str(self.root), prefix=MANIFEST_NAME, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"format": 1, "files": self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def _pool_result(future, task):
+    """
+    Kết quả của 1 future trong convert_many. Process con chết giữa chừng (bị OOM kill, lxml
+    segfault...) làm pool hỏng: file đó và các file chưa xong được tính là lỗi như lỗi convert
+    thường, không dừng cả lượt chạy (manifest vẫn ghi các file đã xong).
+    """
+    try:
+        return future.result()
+    except BrokenProcessPool as e:
+        return task[0], f"process convert bị dừng đột ngột ({e})", "", 0.0
+
+
+def _convert_worker(task):
+    """
+    Convert 1 file (chạy được trong process con). Output in ra được gom lại và trả về cùng
+    kết quả để process chính in theo đúng thứ tự file, không bị xen giữa các process.
+    """
+    md_path, output_path, options = task
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(buf):
+            convert_md_file_to_docx(Path(md_path), Path(output_path), **options)
+        return md_path, None, buf.getvalue(), time.perf_counter() - t0
+    except Exception as e:
+        return md_path, str(e), buf.getvalue(), time.perf_counter() - t0
+
+
+def convert_many(md_files: List[Path], autofit_mode: str = 'window', jobs: int = 1,
+                 manifest: BuildManifest = None, force: bool = False, engine: str = 'html',
+                 stream: bool = False, template: str = None):
+    """
+    Chuyển đổi nhiều file MD sang DOCX (file .docx cạnh file .md).
+    jobs > 1: chia file cho process pool; kết quả từng file được in ngay khi có, theo thứ tự
+    của md_files (giống chạy tuần tự).
+    manifest: chỉ convert file có nội dung/options/version đổi (force=True: convert hết),
+    cập nhật manifest sau mỗi file thành công.
+    Trả về (số file thành công, số file lỗi, số file bỏ qua vì không đổi).
+    """
+    options = build_options(autofit_mode, engine, stream, template)
+    sources = {}
+    skipped_count = 0
+    if manifest is not None:
+        # Sửa nội dung template cũng phải build lại
+        options = dict(options, template_sha=file_digest(template) if template else None)
+        todo = []
+        for f in md_files:
+            info = manifest.source_info(f)
+            if force or manifest.needs_build(f, info, options):
+                sources[str(f)] = info
+                todo.append(f)
+            else:
+                skipped_count += 1
+        md_files = todo
+    convert_options = build_options(autofit_mode, engine, stream, template)
+    tasks = [(str(f), str(f.with_suffix('.docx')), convert_options) for f in md_files]
+    success_count = 0
+    error_count = 0
+    if jobs > 1 and len(tasks) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(tasks)))
+        futures = [pool.submit(_convert_worker, t) for t in tasks]
+        results = (_pool_result(future, task) for future, task in zip(futures, tasks))
+    else:
+        pool = None
+        results = (_convert_worker(t) for t in tasks)
+    try:
+        for md_path, error, output, _ in results:
+            sys.stdout.write(output)
+            if error is None:
+                success_count += 1
+                if manifest is not None:
+                    manifest.record(Path(md_path), sources[md_path], options)
+            else:
+                print(f"  ✗ Lỗi khi xử lý {Path(md_path).name}: {error}")
+                error_count += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if manifest is not None:
+            manifest.save()
+    return success_count, error_count, skipped_count
+
+
+def convert_all_md_in_directory(directory: str, autofit_mode: str = 'window', jobs: int = 1,
+                                incremental: bool = False, force: bool = False, engine: str = 'html',
+                                stream: bool = False, template: str = None):
     """Chuyển đổi tất cả file MD trong thư mục sang DOCX"""
     dir_path = Path(directory)
 
@@ -413,25 +1142,20 @@ def convert_all_md_in_directory(directory: str, autofit_mode: str = 'window'):
     for f in md_files:
         print(f"  - {f.name}")
     print(f"  Table autofit: {autofit_mode}")
+    if jobs > 1:
+        print(f"  Số process: {jobs}")
 
     print(f"\nBắt đầu chuyển đổi...")
 
-    success_count = 0
-    error_count = 0
-
-    for md_file in md_files:
-        try:
-            # Tạo tên file output (đổi .md thành .docx)
-            output_file = md_file.with_suffix('.docx')
-            convert_md_file_to_docx(md_file, output_file, autofit_mode)
-            success_count += 1
-        except Exception as e:
-            print(f"  ✗ Lỗi khi xử lý {md_file.name}: {str(e)}")
-            error_count += 1
+    manifest = BuildManifest(dir_path) if incremental else None
+    success_count, error_count, skipped_count = convert_many(md_files, autofit_mode, jobs, manifest, force,
+                                                             engine, stream, template)
 
     print(f"\n{'='*50}")
     print(f"Hoàn thành!")
     print(f"  - Thành công: {success_count} file")
+    if incremental:
+        print(f"  - Bỏ qua (không đổi): {skipped_count} file")
     if error_count > 0:
         print(f"  - Lỗi: {error_count} file")
 
@@ -449,9 +1173,22 @@ def md2w_main():
     parser.add_argument("-f", "--force", action="store_true", help="Ghi đè file docx đã tồn tại")
     parser.add_argument("--filter", help="Chỉ convert file md có chứa chuỗi này trong tên")
     parser.add_argument("--log", help="Ghi log ra file")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Số process convert song song (0 = số CPU)")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help=f"Chỉ convert file .md đổi nội dung/tùy chọn so với lần trước (lưu ở {MANIFEST_NAME})")
+    parser.add_argument("-e", "--engine", choices=ENGINES,
+                        help="html (mặc định): qua HTML + BeautifulSoup; direct: dựng thẳng từ cây Markdown (nhanh hơn)")
+    parser.add_argument("-s", "--stream", action="store_true",
+                        help="Convert từng khối (engine direct), cho file .md rất lớn, RAM không tăng theo kích thước file")
+    parser.add_argument("-t", "--template", help="File .docx/.dotx dùng làm mẫu (trang, style)")
 
     args = parser.parse_args()
+    if args.stream and args.engine == 'html':
+        parser.error("--stream luôn dùng engine direct, không dùng được với --engine html")
+    args.engine = args.engine or ('direct' if args.stream else 'html')
     LOG_FILE = args.log
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     if LOG_FILE:
         with open(LOG_FILE, "w", encoding="utf-8") as f:
@@ -464,25 +1201,36 @@ def md2w_main():
         if out.exists() and not args.force:
             print("File đã tồn tại, bỏ qua")
         else:
-            print(f"\nChuyển đổi file: {p}")
-            # convert_single_file(input_path,   args.autofit)
+            convert_single_file(p, args.autofit, args.engine, args.stream, args.template)
 
     elif args.recursive:
+        md_files = []
         for D,_,F in os.walk(p):
-            for f in F:
+            for f in sorted(F):
                 if f.lower().endswith(".md"):
                     md_path = Path(D) / f
                     if args.filter and args.filter not in f:
                         continue
                     out_path = md_path.with_suffix(".docx")
-                    if out_path.exists() and not args.force:
+                    if out_path.exists() and not args.force and not args.incremental:
                         print(f"File {md_path} đã tồn tại docx, bỏ qua")
                     else:
-                        print(f"\nChuyển đổi file: {md_path}")
-                        convert_single_file(md_path, args.autofit)    
+                        md_files.append(md_path)
+        print(f"\nChuyển đổi {len(md_files)} file (autofit: {args.autofit}, số process: {jobs})")
+        manifest = BuildManifest(p) if args.incremental else None
+        success_count, error_count, skipped_count = convert_many(md_files, args.autofit, jobs, manifest, args.force,
+                                                                 args.engine, args.stream, args.template)
+        print(f"\n{'='*50}")
+        print(f"Hoàn thành!")
+        print(f"  - Thành công: {success_count} file")
+        if args.incremental:
+            print(f"  - Bỏ qua (không đổi): {skipped_count} file")
+        if error_count > 0:
+            print(f"  - Lỗi: {error_count} file")
     else:
         print(f"\nChuyển đổi tất cả file .md trong thư mục: {p}")
-        convert_all_md_in_directory(p,  args.autofit)
+        convert_all_md_in_directory(p,  args.autofit, jobs, args.incremental, args.force, args.engine,
+                                    args.stream, args.template)
 
 
 if __name__ == "__main__":